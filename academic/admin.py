@@ -1,5 +1,95 @@
 from django.contrib import admin
-from .models import Docente, Curso, Estudiante, Actividad
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
+from .models import Docente, Curso, Estudiante, Actividad, Calificacion
+
+# A partir de este tamaño los listados sin filtros usan el conteo estimado
+CONTEO_EXACTO_MAXIMO = 10000
+
+
+def conteo_estimado(queryset):
+    """
+    Filas estimadas por MySQL (information_schema.TABLES.TABLE_ROWS) para un
+    queryset sin filtros; None si hay filtros o la base no es MySQL.
+    """
+    if connection.vendor != 'mysql' or queryset.query.where:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            [queryset.model._meta.db_table]
+        )
+        fila = cursor.fetchone()
+    return fila[0] if fila else None
+
+
+class PaginadorConteoEstimado(Paginator):
+    """Evita el COUNT(*) completo en tablas grandes sin filtros"""
+
+    @cached_property
+    def count(self):
+        estimado = conteo_estimado(self.object_list)
+        if estimado is not None and estimado > CONTEO_EXACTO_MAXIMO:
+            return estimado
+        return super().count
+
+
+class FiltroCursoAutocompletar(admin.SimpleListFilter):
+    """
+    Filtro por curso que no carga todos los cursos: muestra un select con
+    autocompletado que consulta admin/autocomplete/ (CursoAdmin.search_fields).
+    """
+    title = 'curso'
+    parameter_name = 'id_curso'
+    template = 'admin/academic/filtro_autocompletar.html'
+
+    def __init__(self, request, params, model, model_admin):
+        super().__init__(request, params, model, model_admin)
+        self.model_admin = model_admin
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        try:
+            return queryset.filter(id_curso=int(self.value()))
+        except ValueError:
+            raise IncorrectLookupParameters(f'id_curso inválido: {self.value()}')
+
+    @cached_property
+    def campo(self):
+        """Select de autocompletado; solo consulta el curso seleccionado"""
+        campo = self.model_admin.model._meta.get_field('id_curso')
+        formfield = campo.formfield(
+            widget=AutocompleteSelect(campo, self.model_admin.admin_site), required=False
+        )
+        return formfield.widget.render(
+            self.parameter_name, self.value(), attrs={'id': f'filtro_{self.parameter_name}'}
+        )
+
+
+class ListadoEscalableMixin:
+    """
+    Changelist con presupuesto fijo de consultas: joins con
+    list_select_related, conteo estimado y sin el segundo COUNT(*) del total.
+    """
+    paginator = PaginadorConteoEstimado
+    show_full_result_count = False
+
+    @property
+    def media(self):
+        campo = self.model._meta.get_field('id_curso')
+        return super().media + AutocompleteSelect(campo, self.admin_site).media
+
 
 @admin.register(Docente)
 class DocenteAdmin(admin.ModelAdmin):
@@ -11,16 +101,22 @@ class DocenteAdmin(admin.ModelAdmin):
 @admin.register(Curso)
 class CursoAdmin(admin.ModelAdmin):
     list_display = ['id_curso', 'nombre', 'codigo', 'estado', 'id_docente']
+    list_select_related = ['id_docente']
     list_filter = ['estado']
-    search_fields = ['nombre', 'codigo']
+    # Búsqueda por prefijo (LIKE 'x%') para usar los índices de nombre y código;
+    # también la usa el autocompletado de cursos
+    search_fields = ['^nombre', '^codigo']
+    ordering = ['nombre']
     list_per_page = 20
 
 
 @admin.register(Estudiante)
-class EstudianteAdmin(admin.ModelAdmin):
+class EstudianteAdmin(ListadoEscalableMixin, admin.ModelAdmin):
     list_display = ['id_estudiante', 'nombre', 'id_curso', 'nota_final', 'get_estado']
-    list_filter = ['id_curso']
-    search_fields = ['nombre']
+    list_select_related = ['id_curso']
+    list_filter = [FiltroCursoAutocompletar]
+    search_fields = ['^nombre', '=id_estudiante']
+    autocomplete_fields = ['id_curso']
     list_per_page = 20
     
     def get_estado(self, obj):
@@ -29,9 +125,19 @@ class EstudianteAdmin(admin.ModelAdmin):
 
 
 @admin.register(Actividad)
-class ActividadAdmin(admin.ModelAdmin):
+class ActividadAdmin(ListadoEscalableMixin, admin.ModelAdmin):
     list_display = ['id_actividad', 'nombre', 'tipo', 'id_curso', 'fecha_entrega', 'porcentaje', 'estado']
-    list_filter = ['tipo', 'estado', 'id_curso']
-    search_fields = ['nombre']
+    list_select_related = ['id_curso']
+    list_filter = ['tipo', 'estado', FiltroCursoAutocompletar]
+    search_fields = ['^nombre', '=id_actividad']
+    autocomplete_fields = ['id_curso']
     date_hierarchy = 'fecha_entrega'
-    list_per_page = 20
\ No newline at end of file
+    list_per_page = 20
+
+
+@admin.register(Calificacion)
+class CalificacionAdmin(admin.ModelAdmin):
+    list_display = ['id_calificacion', 'id_estudiante', 'id_actividad', 'nota']
+    list_select_related = ['id_estudiante', 'id_actividad']
+    raw_id_fields = ['id_estudiante', 'id_actividad']
+    list_per_page = 20
@@ -0,0 +1,240 @@
+"""
+Almacén analítico embebido para reportes históricos y entre periodos.
+
+Cada snapshot copia las tablas académicas a archivos Parquet en
+ANALITICA_DIR/snapshots/<snapshot_id>/ (con snapshot_id, tomado_en y
+periodo en cada fila) y nunca se modifica, así que las notas anteriores
+quedan registradas; tomado_en se guarda en UTC. Las consultas se resuelven
+con DuckDB en memoria sobre esos archivos, sin tocar la base OLTP. duckdb es
+una dependencia opcional: solo se importa al tomar un snapshot o consultar.
+"""
+import csv
+import datetime
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+
+from .models import Docente, Curso, Estudiante, Actividad, Calificacion
+
+# tabla -> (modelo, {columna: tipo DuckDB})
+TABLAS = {
+    'docentes': (Docente, {
+        'id_docente': 'INTEGER', 'nombre': 'VARCHAR', 'correo': 'VARCHAR', 'telefono': 'VARCHAR',
+    }),
+    'cursos': (Curso, {
+        'id_curso': 'INTEGER', 'nombre': 'VARCHAR', 'codigo': 'VARCHAR',
+        'estado': 'VARCHAR', 'id_docente': 'INTEGER',
+    }),
+    'estudiantes': (Estudiante, {
+        'id_estudiante': 'INTEGER', 'nombre': 'VARCHAR', 'id_curso': 'INTEGER',
+        'nota_final': 'DECIMAL(3,1)',
+    }),
+    'actividades': (Actividad, {
+        'id_actividad': 'INTEGER', 'nombre': 'VARCHAR', 'tipo': 'VARCHAR', 'fecha_entrega': 'DATE',
+        'porcentaje': 'INTEGER', 'estado': 'VARCHAR', 'id_curso': 'INTEGER',
+    }),
+    'calificaciones': (Calificacion, {
+        'id_calificacion': 'INTEGER', 'id_estudiante': 'INTEGER', 'id_actividad': 'INTEGER',
+        'nota': 'DECIMAL(3,1)',
+    }),
+}
+
+
+def directorio():
+    return Path(settings.ANALITICA_DIR) / 'snapshots'
+
+
+def directorio_temporal():
+    """Donde se arma cada snapshot: fuera de directorio(), así ninguna consulta lo ve a medias"""
+    return Path(settings.ANALITICA_DIR) / 'tmp'
+
+
+def periodo_de(fecha):
+    """Periodo académico semestral: 2025-1 (ene-jun) o 2025-2 (jul-dic)"""
+    return f'{fecha.year}-{1 if fecha.month <= 6 else 2}'
+
+
+def _conectar():
+    try:
+        import duckdb
+    except ImportError:
+        raise ImproperlyConfigured('El almacén analítico requiere duckdb (pip install duckdb)')
+    return duckdb.connect()
+
+
+# ==========================================
+# ETL: SNAPSHOTS
+# ==========================================
+
+def tomar_snapshot(periodo=None):
+    """Copia las tablas a un snapshot Parquet nuevo; devuelve {snapshot_id, periodo, filas}"""
+    tomado_en = timezone.now()
+    snapshot_id = tomado_en.strftime('%Y%m%dT%H%M%S%f')
+    periodo = periodo or periodo_de(timezone.localtime(tomado_en))
+
+    destino = directorio() / snapshot_id
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    # Mismo sistema de archivos que el destino para que el rename sea atómico
+    directorio_temporal().mkdir(parents=True, exist_ok=True)
+    temporal = Path(tempfile.mkdtemp(dir=directorio_temporal(), prefix=f'{snapshot_id}-'))
+    filas = {}
+    try:
+        con = _conectar()
+        for tabla, (modelo, columnas) in TABLAS.items():
+            filas[tabla] = _exportar_tabla(
+                con, modelo, columnas, temporal / f'{tabla}.parquet', snapshot_id, tomado_en, periodo
+            )
+        con.close()
+        # El snapshot aparece completo o no aparece
+        os.rename(temporal, destino)
+    except BaseException:
+        shutil.rmtree(temporal, ignore_errors=True)
+        raise
+    return {'snapshot_id': snapshot_id, 'periodo': periodo, 'filas': filas}
+
+
+def _exportar_tabla(con, modelo, columnas, ruta, snapshot_id, tomado_en, periodo):
+    """Vuelca las filas a un CSV temporal y DuckDB lo convierte a Parquet"""
+    total = 0
+    with tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', delete=False) as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(columnas)
+        for fila in modelo.objects.order_by('pk').values_list(*columnas).iterator(chunk_size=5000):
+            escritor.writerow(['' if valor is None else valor for valor in fila])
+            total += 1
+    try:
+        tipos = ', '.join(f"'{columna}': '{tipo}'" for columna, tipo in columnas.items())
+        con.execute(
+            f"COPY (SELECT ? AS snapshot_id, ?::TIMESTAMP AS tomado_en, ? AS periodo, * "
+            f"FROM read_csv(?, header = true, columns = {{{tipos}}})) "
+            f"TO '{ruta}' (FORMAT parquet)",
+            [snapshot_id, timezone.make_naive(tomado_en, datetime.timezone.utc), periodo, archivo.name]
+        )
+    finally:
+        os.unlink(archivo.name)
+    return total
+
+
+def snapshots():
+    """Snapshots disponibles, del más antiguo al más reciente"""
+    if not directorio().exists():
+        return []
+    return sorted(p.name for p in directorio().iterdir() if p.is_dir() and not p.name.startswith('.'))
+
+
+# ==========================================
+# CONSULTAS
+# ==========================================
+
+def _archivos(tabla, publicados):
+    """Lista SQL con el Parquet de tabla en cada snapshot publicado"""
+    rutas = (directorio() / snapshot_id / f'{tabla}.parquet' for snapshot_id in publicados)
+    return ', '.join("'{}'".format(ruta.as_posix().replace("'", "''")) for ruta in rutas if ruta.exists())
+
+
+def _consultar(sql, parametros=()):
+    """Ejecuta sql con una vista por tabla sobre todos los snapshots; [] si no hay ninguno"""
+    publicados = snapshots()
+    if not publicados:
+        return []
+    con = _conectar()
+    try:
+        for tabla in TABLAS:
+            # Lista explícita y no un glob: DuckDB también recorre directorios ocultos,
+            # y un snapshot a medio escribir (o abandonado) no debe entrar a los reportes
+            con.execute(
+                f"CREATE VIEW {tabla} AS SELECT * "
+                f"FROM read_parquet([{_archivos(tabla, publicados)}], union_by_name = true)"
+            )
+        cursor = con.execute(sql, list(parametros))
+        nombres = [d[0] for d in cursor.description]
+        return [dict(zip(nombres, fila)) for fila in cursor.fetchall()]
+    finally:
+        con.close()
+
+
+def _limpiar(filas):
+    """Convierte Decimal/fechas de DuckDB a tipos serializables en JSON"""
+    for fila in filas:
+        for clave, valor in fila.items():
+            if hasattr(valor, 'isoformat'):
+                fila[clave] = valor.isoformat()
+            elif valor is not None and not isinstance(valor, (int, float, str)):
+                fila[clave] = round(float(valor), 2)
+    return filas
+
+
+# Último snapshot de cada periodo (foto de cierre del periodo)
+_CIERRES = """
+    cierres AS (
+        SELECT periodo, max(snapshot_id) AS snapshot_id FROM estudiantes GROUP BY periodo
+    )
+"""
+
+
+def tendencia(id_curso=None):
+    """Promedio y tasa de aprobación en cada snapshot (global o de un curso)"""
+    return _limpiar(_consultar(f"""
+        SELECT snapshot_id, min(tomado_en) AS tomado_en, min(periodo) AS periodo,
+               count(*) AS estudiantes,
+               round(avg(nota_final), 2) AS promedio,
+               round(100.0 * count(*) FILTER (WHERE nota_final >= 3.0)
+                     / nullif(count(nota_final), 0), 1) AS tasa_aprobacion
+        FROM estudiantes
+        {'WHERE id_curso = ?' if id_curso else ''}
+        GROUP BY snapshot_id
+        ORDER BY snapshot_id
+    """, [int(id_curso)] if id_curso else []))
+
+
+def por_periodo(id_curso=None):
+    """Resultados de cada curso al cierre de cada periodo"""
+    return _limpiar(_consultar(f"""
+        WITH {_CIERRES}
+        SELECT e.periodo, e.id_curso, c.nombre AS curso, c.codigo,
+               count(*) AS estudiantes,
+               round(avg(e.nota_final), 2) AS promedio,
+               round(100.0 * count(*) FILTER (WHERE e.nota_final >= 3.0)
+                     / nullif(count(e.nota_final), 0), 1) AS tasa_aprobacion
+        FROM estudiantes e
+        JOIN cierres USING (snapshot_id, periodo)
+        LEFT JOIN cursos c ON c.snapshot_id = e.snapshot_id AND c.id_curso = e.id_curso
+        {'WHERE e.id_curso = ?' if id_curso else ''}
+        GROUP BY e.periodo, e.id_curso, c.nombre, c.codigo
+        ORDER BY e.periodo, e.id_curso
+    """, [int(id_curso)] if id_curso else []))
+
+
+def por_docente(periodo=None):
+    """Resultados por docente al cierre de cada periodo (o solo del indicado)"""
+    return _limpiar(_consultar(f"""
+        WITH {_CIERRES}
+        SELECT e.periodo, c.id_docente, d.nombre AS docente,
+               count(DISTINCT c.id_curso) AS cursos,
+               count(*) AS estudiantes,
+               round(avg(e.nota_final), 2) AS promedio,
+               round(100.0 * count(*) FILTER (WHERE e.nota_final >= 3.0)
+                     / nullif(count(e.nota_final), 0), 1) AS tasa_aprobacion
+        FROM estudiantes e
+        JOIN cierres USING (snapshot_id, periodo)
+        JOIN cursos c ON c.snapshot_id = e.snapshot_id AND c.id_curso = e.id_curso
+        LEFT JOIN docentes d ON d.snapshot_id = c.snapshot_id AND d.id_docente = c.id_docente
+        {'WHERE e.periodo = ?' if periodo else ''}
+        GROUP BY e.periodo, c.id_docente, d.nombre
+        ORDER BY e.periodo, promedio DESC NULLS LAST
+    """, [periodo] if periodo else []))
+
+
+def historial_estudiante(id_estudiante):
+    """Notas de un estudiante en cada snapshot, incluidas las ya reemplazadas"""
+    return _limpiar(_consultar("""
+        SELECT snapshot_id, tomado_en, periodo, id_curso, nota_final
+        FROM estudiantes
+        WHERE id_estudiante = ?
+        ORDER BY snapshot_id
+    """, [int(id_estudiante)]))
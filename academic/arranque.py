@@ -0,0 +1,55 @@
+"""
+Medición del arranque en frío de un proceso worker.
+
+Importa Django y la URLconf en un subproceso limpio con `python -X importtime`
+y devuelve el tiempo total, la memoria residente máxima y el costo de
+importación por paquete. Lo usan `manage.py perfil_arranque` y la prueba
+de presupuesto de importación.
+"""
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+
+# Dependencias pesadas que solo deben cargarse al usarse (exportar, notas, analítica)
+MODULOS_DIFERIDOS = ('openpyxl', 'numpy', 'duckdb')
+
+_CODIGO = """
+import importlib, json, resource, sys, time
+inicio = time.perf_counter()
+import django
+django.setup()
+from django.conf import settings
+importlib.import_module(settings.ROOT_URLCONF)
+segundos = time.perf_counter() - inicio
+print(json.dumps({
+    'segundos': segundos,
+    'rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'modulos': sorted(sys.modules),
+}))
+"""
+
+
+def medir_arranque():
+    """{segundos, rss_kb, modulos, por_paquete: {paquete: microsegundos}}"""
+    entorno = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get(
+        'DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE
+    ))
+    proceso = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _CODIGO],
+        cwd=settings.BASE_DIR, env=entorno, capture_output=True, text=True, check=True
+    )
+
+    resultado = json.loads(proceso.stdout.strip().splitlines()[-1])
+    por_paquete = defaultdict(int)
+    for linea in proceso.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not linea.startswith('import time:') or 'imported package' in linea:
+            continue
+        propio, _, modulo = linea[len('import time:'):].split('|')
+        por_paquete[modulo.strip().split('.')[0]] += int(propio)
+    resultado['por_paquete'] = dict(por_paquete)
+    return resultado
@@ -0,0 +1,184 @@
+"""
+Rankings precalculados de estudiantes por nota final (global y por curso).
+
+Se cargan desde la base de datos en el primer uso y luego se mantienen de
+forma incremental con las escrituras de EstudianteViewSet, así que leer el
+top N cuesta O(N) y la posición de un estudiante es una búsqueda binaria
+O(log n). Insertar o quitar solo desplaza la lista (un memmove en C).
+El estado vive en memoria de cada proceso: las escrituras hechas por otro
+worker, el admin o SQL directo no llegan aquí, así que los rankings se
+recargan completos cuando tienen más de CLASIFICACIONES_MAX_EDAD segundos
+(o tras invalidar()). Ese es el desfase máximo entre workers.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+from .models import Curso, Estudiante
+
+
+class Clasificacion:
+    """Ranking ordenado por nota descendente; los empates se ordenan por id"""
+
+    def __init__(self):
+        self._claves = []   # [(-nota, id_estudiante)] siempre ordenada
+        self._notas = {}    # id_estudiante -> nota
+
+    def __len__(self):
+        return len(self._claves)
+
+    def __contains__(self, id_estudiante):
+        return id_estudiante in self._notas
+
+    def cargar(self, pares):
+        """Reemplaza el contenido con [(id_estudiante, nota)] ordenando una sola vez"""
+        self._claves = sorted((-nota, id_estudiante) for id_estudiante, nota in pares)
+        self._notas = {id_estudiante: -nota for nota, id_estudiante in self._claves}
+
+    def agregar(self, id_estudiante, nota):
+        clave = (-nota, id_estudiante)
+        self._claves.insert(bisect_left(self._claves, clave), clave)
+        self._notas[id_estudiante] = nota
+
+    def quitar(self, id_estudiante):
+        nota = self._notas.pop(id_estudiante, None)
+        if nota is None:
+            return
+        del self._claves[bisect_left(self._claves, (-nota, id_estudiante))]
+
+    def top(self, n):
+        """[(id_estudiante, nota)] de los n primeros"""
+        return [(id_estudiante, -nota) for nota, id_estudiante in self._claves[:n]]
+
+    def posicion(self, id_estudiante):
+        """Posición 1-based del estudiante o None si no está en el ranking"""
+        nota = self._notas.get(id_estudiante)
+        if nota is None:
+            return None
+        return bisect_left(self._claves, (-nota, id_estudiante)) + 1
+
+
+class Clasificaciones:
+    """Ranking global más uno por id_curso, protegidos por un lock"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cargado = False
+        self._cargado_en = 0.0
+        self._global = Clasificacion()
+        self._por_curso = {}
+        self._estudiantes = {}  # id_estudiante -> (nombre, id_curso)
+
+    def invalidar(self):
+        with self._lock:
+            self._cargado = False
+            self._global = Clasificacion()
+            self._por_curso = {}
+            self._estudiantes = {}
+
+    def actualizar(self, estudiante):
+        """Inserta o reubica un estudiante tras crearlo o editarlo"""
+        with self._lock:
+            if not self._cargado:
+                return
+            self._quitar(estudiante.id_estudiante)
+            self._agregar(
+                estudiante.id_estudiante, estudiante.nombre,
+                estudiante.id_curso_id, estudiante.nota_final
+            )
+
+    def eliminar(self, id_estudiante):
+        with self._lock:
+            if self._cargado:
+                self._quitar(id_estudiante)
+
+    def top(self, n=10, id_curso=None):
+        with self._lock:
+            self._cargar()
+            if id_curso is None:
+                clasificacion = self._global
+            else:
+                clasificacion = self._por_curso.get(id_curso, Clasificacion())
+            primeros = [
+                (id_estudiante, nota) + self._estudiantes[id_estudiante]
+                for id_estudiante, nota in clasificacion.top(n)
+            ]
+
+        nombres_cursos = dict(
+            Curso.objects.filter(
+                id_curso__in={curso for _, _, _, curso in primeros if curso is not None}
+            ).values_list('id_curso', 'nombre')
+        )
+        return [
+            {
+                'posicion': posicion,
+                'estudiante': nombre,
+                'curso': nombres_cursos.get(curso) or 'Sin curso',
+                'promedio': float(nota),
+            }
+            for posicion, (_, nota, nombre, curso) in enumerate(primeros, start=1)
+        ]
+
+    def posicion(self, id_estudiante):
+        """Posición global y en su curso; None si el estudiante no tiene nota"""
+        with self._lock:
+            self._cargar()
+            if id_estudiante not in self._global:
+                return None
+            _, id_curso = self._estudiantes[id_estudiante]
+            del_curso = self._por_curso.get(id_curso, Clasificacion())
+            return {
+                'id_estudiante': id_estudiante,
+                'id_curso': id_curso,
+                'posicion_global': self._global.posicion(id_estudiante),
+                'total_global': len(self._global),
+                'posicion_curso': del_curso.posicion(id_estudiante),
+                'total_curso': len(del_curso),
+            }
+
+    def _cargar(self):
+        max_edad = getattr(settings, 'CLASIFICACIONES_MAX_EDAD', 60)
+        if self._cargado and (not max_edad or time.monotonic() - self._cargado_en < max_edad):
+            return
+        filas = Estudiante.objects.filter(nota_final__isnull=False).values_list(
+            'id_estudiante', 'nombre', 'id_curso', 'nota_final'
+        )
+
+        self._estudiantes = {}
+        por_curso = {}
+        for id_estudiante, nombre, id_curso, nota in filas:
+            self._estudiantes[id_estudiante] = (nombre, id_curso)
+            por_curso.setdefault(id_curso, []).append((id_estudiante, nota))
+
+        self._global = Clasificacion()
+        self._global.cargar(
+            (id_estudiante, nota) for pares in por_curso.values() for id_estudiante, nota in pares
+        )
+        self._por_curso = {}
+        for id_curso, pares in por_curso.items():
+            self._por_curso[id_curso] = Clasificacion()
+            self._por_curso[id_curso].cargar(pares)
+
+        self._cargado = True
+        self._cargado_en = time.monotonic()
+
+    def _agregar(self, id_estudiante, nombre, id_curso, nota):
+        if nota is None:
+            return
+        self._estudiantes[id_estudiante] = (nombre, id_curso)
+        self._global.agregar(id_estudiante, nota)
+        self._por_curso.setdefault(id_curso, Clasificacion()).agregar(id_estudiante, nota)
+
+    def _quitar(self, id_estudiante):
+        datos = self._estudiantes.pop(id_estudiante, None)
+        if datos is None:
+            return
+        self._global.quitar(id_estudiante)
+        del_curso = self._por_curso.get(datos[1])
+        if del_curso is not None:
+            del_curso.quitar(id_estudiante)
+
+
+clasificaciones = Clasificaciones()
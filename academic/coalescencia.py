@@ -0,0 +1,109 @@
+"""
+Coalescencia de peticiones (single-flight) para cálculos costosos.
+
+Si llegan varias peticiones idénticas mientras una ya está calculando, las
+demás esperan y reciben el mismo resultado en lugar de repetir las
+consultas. Dentro de un proceso se coordina con hilos; entre procesos, si
+COALESCENCIA_CACHE nombra un cache compartido (Redis, Memcached, base de
+datos), se usa un lock en ese cache y el resultado se publica ahí.
+
+Con usar/liberar cada participante transforma el resultado compartido (p.
+ej. abre un archivo) y liberar(resultado) corre una vez, cuando el último
+participante del proceso terminó de usarlo.
+"""
+import hashlib
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+_SIN_RESULTADO = object()
+
+
+class _Llamada:
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.error = None
+        self.participantes = 1
+
+
+class Coalescedor:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._en_curso = {}  # clave -> _Llamada
+
+    def ejecutar(self, clave, funcion, usar=None, liberar=None):
+        """
+        Devuelve funcion() (o usar(funcion())) compartiendo la ejecución con
+        las llamadas simultáneas de la misma clave.
+        """
+        with self._lock:
+            llamada = self._en_curso.get(clave)
+            lider = llamada is None
+            if lider:
+                llamada = self._en_curso[clave] = _Llamada()
+            else:
+                llamada.participantes += 1
+
+        if lider:
+            try:
+                llamada.resultado = self._ejecutar_entre_procesos(clave, funcion)
+            except Exception as e:
+                llamada.error = e
+                raise
+            finally:
+                # Fuera de _en_curso nadie más se suma: participantes ya es definitivo
+                with self._lock:
+                    del self._en_curso[clave]
+                llamada.evento.set()
+        else:
+            llamada.evento.wait()
+            if llamada.error is not None:
+                raise llamada.error
+
+        try:
+            return usar(llamada.resultado) if usar else llamada.resultado
+        finally:
+            with self._lock:
+                llamada.participantes -= 1
+                ultimo = llamada.participantes == 0
+            if ultimo and liberar:
+                liberar(llamada.resultado)
+
+    def _ejecutar_entre_procesos(self, clave, funcion):
+        alias = getattr(settings, 'COALESCENCIA_CACHE', None)
+        if not alias:
+            return funcion()
+
+        cache = caches[alias]
+        espera_maxima = getattr(settings, 'COALESCENCIA_ESPERA_MAXIMA', 120)
+        base = 'coalescencia:' + hashlib.sha1(repr(clave).encode()).hexdigest()
+        clave_lock = base + ':lock'
+
+        # El valor del lock identifica esta ejecución para no leer resultados de otra anterior
+        turno = uuid.uuid4().hex
+        if cache.add(clave_lock, turno, timeout=espera_maxima):
+            try:
+                resultado = funcion()
+                cache.set(f'{base}:{turno}', resultado, timeout=espera_maxima)
+                return resultado
+            finally:
+                cache.delete(clave_lock)
+
+        turno = cache.get(clave_lock)
+        limite = time.monotonic() + espera_maxima
+        while turno is not None and time.monotonic() < limite:
+            time.sleep(0.05)
+            resultado = cache.get(f'{base}:{turno}', _SIN_RESULTADO)
+            if resultado is not _SIN_RESULTADO:
+                return resultado
+            if cache.get(clave_lock) != turno:
+                # El líder terminó (o falló) sin dejar resultado visible
+                break
+        return funcion()
+
+
+coalescedor = Coalescedor()
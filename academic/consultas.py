@@ -0,0 +1,119 @@
+"""
+Consultas de reportes que se resuelven en una sola sentencia SQL.
+
+Los modelos son managed = False y el esquema vive en la base, así que
+cuando el ORM no expresa bien la agregación (varias tablas hijas sin
+multiplicar filas) se usa SQL directo con tablas derivadas.
+"""
+from django.db import connection
+
+from .models import Actividad
+
+SEPARADOR = '||'
+
+
+def _concatenar(columna):
+    """Agregado de texto según el motor (GROUP_CONCAT / STRING_AGG)"""
+    if connection.vendor == 'mysql':
+        return f"GROUP_CONCAT({columna} ORDER BY {columna} SEPARATOR '{SEPARADOR}')"
+    if connection.vendor == 'postgresql':
+        return f"STRING_AGG({columna}, '{SEPARADOR}' ORDER BY {columna})"
+    return f"GROUP_CONCAT({columna}, '{SEPARADOR}')"
+
+
+def estadisticas_docentes():
+    """
+    Carga y rendimiento por docente: cursos, total de estudiantes,
+    actividades por tipo, promedio y tasa de aprobación. Estudiantes y
+    actividades se agregan primero por curso (tablas derivadas) para no
+    multiplicar filas, y luego todo se agrupa por docente en la misma consulta.
+    """
+    tipos = [tipo for tipo, _ in Actividad.TIPO_CHOICES]
+    columnas_tipo = ', '.join(
+        f'SUM(CASE WHEN tipo = %s THEN 1 ELSE 0 END) AS tipo_{i}' for i in range(len(tipos))
+    )
+    totales_tipo = ', '.join(
+        f'COALESCE(SUM(a.tipo_{i}), 0)' for i in range(len(tipos))
+    )
+    sql = f"""
+        SELECT d.id_docente, d.nombre,
+               COUNT(c.id_curso),
+               {_concatenar('c.nombre')},
+               COALESCE(SUM(e.total), 0),
+               COALESCE(SUM(e.con_nota), 0),
+               SUM(e.suma_notas),
+               COALESCE(SUM(e.aprobados), 0),
+               COALESCE(SUM(a.total), 0),
+               {totales_tipo}
+        FROM docentes d
+        LEFT JOIN cursos c ON c.id_docente = d.id_docente
+        LEFT JOIN (
+            SELECT id_curso,
+                   COUNT(*) AS total,
+                   COUNT(nota_final) AS con_nota,
+                   SUM(nota_final) AS suma_notas,
+                   SUM(CASE WHEN nota_final >= 3.0 THEN 1 ELSE 0 END) AS aprobados
+            FROM estudiantes
+            GROUP BY id_curso
+        ) e ON e.id_curso = c.id_curso
+        LEFT JOIN (
+            SELECT id_curso, COUNT(*) AS total, {columnas_tipo}
+            FROM actividades
+            GROUP BY id_curso
+        ) a ON a.id_curso = c.id_curso
+        GROUP BY d.id_docente, d.nombre
+        ORDER BY d.nombre
+    """
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            # GROUP_CONCAT corta en 1024 caracteres por defecto
+            cursor.execute('SET SESSION group_concat_max_len = 1000000')
+        cursor.execute(sql, tipos)
+        filas = cursor.fetchall()
+
+    resultados = []
+    for fila in filas:
+        (id_docente, nombre, num_cursos, cursos, total_estudiantes,
+         con_nota, suma_notas, aprobados, total_actividades) = fila[:9]
+        resultados.append({
+            'id_docente': id_docente,
+            'docente': nombre,
+            'num_cursos': num_cursos,
+            'cursos': sorted(cursos.split(SEPARADOR)) if cursos else [],
+            'total_estudiantes': int(total_estudiantes),
+            'total_actividades': int(total_actividades),
+            'actividades_por_tipo': {tipo: int(n) for tipo, n in zip(tipos, fila[9:])},
+            'promedio': round(float(suma_notas) / con_nota, 2) if con_nota else None,
+            'tasa_aprobacion': round(100.0 * int(aprobados) / con_nota, 1) if con_nota else None,
+        })
+    return resultados
+
+
+def actividades_pendientes_por_curso(hoy):
+    """
+    Actividades pendientes o con entrega futura, agrupadas por nombre de curso.
+    El OR original (estado = 'Pendiente' OR fecha_entrega > hoy) se reescribe
+    como UNION ALL de dos ramas disjuntas, cada una resuelta con su índice
+    (actividades_estado_idx y actividades_calendario_idx) sin leer las filas.
+    """
+    sql = """
+        SELECT c.nombre, SUM(u.pendientes)
+        FROM (
+            SELECT id_curso, COUNT(*) AS pendientes
+            FROM actividades
+            WHERE estado = %s
+            GROUP BY id_curso
+            UNION ALL
+            SELECT id_curso, COUNT(*)
+            FROM actividades
+            WHERE fecha_entrega > %s AND (estado IS NULL OR estado <> %s)
+            GROUP BY id_curso
+        ) u
+        LEFT JOIN cursos c ON c.id_curso = u.id_curso
+        GROUP BY c.nombre
+        ORDER BY 2 DESC
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, ['Pendiente', hoy, 'Pendiente'])
+        return [(nombre, int(pendientes)) for nombre, pendientes in cursor.fetchall()]
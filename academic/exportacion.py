@@ -0,0 +1,493 @@
+"""
+Generación de hojas de Excel para /api/exportar/.
+
+Cada tipo de exportación se describe con su título, encabezados y un
+generador de filas; así la misma lógica sirve para el libro de una sola
+hoja y para el libro completo, cuyas hojas se generan en paralelo. En modo
+write_only las filas van de la consulta (por lotes) al archivo sin
+acumularse en memoria; los anchos de columna salen de una muestra. En el
+libro completo write_only cada hilo vuelca sus filas a un temporal y el
+libro se arma después leyéndolos en orden.
+openpyxl se importa dentro de las funciones que escriben libros: solo lo
+cargan los procesos que llegan a exportar.
+"""
+import os
+import pickle
+import tempfile
+import time
+from functools import lru_cache
+from itertools import chain, islice
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Avg
+
+from .consultas import estadisticas_docentes
+from .models import Docente, Curso, Estudiante, Actividad, estado_nota
+from .serializers import TAMANO_LOTE
+
+ANCHO_MAXIMO = 50
+MUESTRA_ANCHOS = 1000
+
+
+@lru_cache(maxsize=None)
+def _estilos_encabezado():
+    """(font, fill, alignment) de los encabezados"""
+    from openpyxl.styles import Font, Alignment, PatternFill
+    
+    return (
+        Font(bold=True, color="FFFFFF", size=12),
+        PatternFill(start_color="1a5276", end_color="1a5276", fill_type="solid"),
+        Alignment(horizontal="center", vertical="center"),
+    )
+
+
+def _aplicar_estilo_encabezado(cell):
+    cell.font, cell.fill, cell.alignment = _estilos_encabezado()
+
+
+# ==========================================
+# FILAS POR TIPO
+# ==========================================
+
+def filas_estudiantes(id_curso=None):
+    # values_list en lugar de instancias: las exportaciones grandes no cargan modelos completos
+    estudiantes = Estudiante.objects.all()
+    if id_curso:
+        estudiantes = estudiantes.filter(id_curso=id_curso)
+    
+    return (
+        [
+            id_estudiante,
+            nombre or '',
+            curso_nombre if tiene_curso else 'Sin curso',
+            curso_codigo if tiene_curso else '-',
+            float(nota_final) if nota_final else '-',
+            estado_nota(nota_final)
+        ]
+        for id_estudiante, nombre, tiene_curso, curso_nombre, curso_codigo, nota_final in estudiantes.values_list(
+            'id_estudiante', 'nombre', 'id_curso', 'id_curso__nombre', 'id_curso__codigo', 'nota_final'
+        ).iterator(chunk_size=TAMANO_LOTE)
+    )
+
+
+def filas_cursos(id_curso=None):
+    for c in Curso.objects.select_related('id_docente').iterator(chunk_size=TAMANO_LOTE):
+        num_estudiantes = Estudiante.objects.filter(id_curso=c).count()
+        num_actividades = Actividad.objects.filter(id_curso=c).count()
+        
+        estudiantes_con_nota = Estudiante.objects.filter(id_curso=c, nota_final__isnull=False)
+        if estudiantes_con_nota.exists():
+            promedio = estudiantes_con_nota.aggregate(Avg('nota_final'))['nota_final__avg']
+            promedio = round(float(promedio), 2) if promedio else '-'
+        else:
+            promedio = '-'
+        
+        yield [
+            c.id_curso,
+            c.nombre or '',
+            c.codigo or '',
+            c.descripcion or '',
+            c.estado or '',
+            c.id_docente.nombre if c.id_docente else 'Sin docente',
+            num_estudiantes,
+            num_actividades,
+            promedio
+        ]
+
+
+def filas_actividades(id_curso=None):
+    actividades = Actividad.objects.all()
+    if id_curso:
+        actividades = actividades.filter(id_curso=id_curso)
+    
+    return (
+        [
+            id_actividad,
+            nombre or '',
+            tipo or '',
+            curso_nombre if tiene_curso else 'Sin curso',
+            curso_codigo if tiene_curso else '-',
+            fecha_entrega.strftime('%d/%m/%Y') if fecha_entrega else '-',
+            porcentaje or 0,
+            estado or ''
+        ]
+        for (id_actividad, nombre, tipo, tiene_curso, curso_nombre, curso_codigo,
+             fecha_entrega, porcentaje, estado) in actividades.values_list(
+            'id_actividad', 'nombre', 'tipo', 'id_curso', 'id_curso__nombre', 'id_curso__codigo',
+            'fecha_entrega', 'porcentaje', 'estado'
+        ).iterator(chunk_size=TAMANO_LOTE)
+    )
+
+
+def filas_reporte_completo(id_curso=None):
+    estudiantes = Estudiante.objects.filter(
+        id_curso__estado='Activo'
+    ).select_related('id_curso')
+    
+    for e in estudiantes.iterator(chunk_size=TAMANO_LOTE):
+        num_actividades = Actividad.objects.filter(id_curso=e.id_curso).count() if e.id_curso else 0
+        
+        yield [
+            e.id_curso.nombre if e.id_curso else 'Sin curso',
+            e.id_curso.codigo if e.id_curso else '-',
+            e.nombre or '',
+            float(e.nota_final) if e.nota_final else '-',
+            e.estado,
+            num_actividades
+        ]
+
+
+def filas_docentes(id_curso=None):
+    for d in estadisticas_docentes():
+        por_tipo = d['actividades_por_tipo']
+        yield [
+            d['id_docente'],
+            d['docente'] or '',
+            d['num_cursos'],
+            ', '.join(d['cursos']),
+            d['total_estudiantes'],
+            d['total_actividades'],
+            *[por_tipo[tipo] for tipo, _ in Actividad.TIPO_CHOICES],
+            d['promedio'] if d['promedio'] is not None else '-',
+            d['tasa_aprobacion'] if d['tasa_aprobacion'] is not None else '-'
+        ]
+
+
+# tipo -> (título de la hoja, encabezados, generador de filas)
+HOJAS = {
+    'estudiantes': (
+        "Estudiantes",
+        ['ID', 'Nombre Completo', 'Curso', 'Código Curso', 'Nota Final', 'Estado'],
+        filas_estudiantes,
+    ),
+    'cursos': (
+        "Cursos",
+        ['ID', 'Nombre', 'Código', 'Descripción', 'Estado',
+         'Docente', 'Total Estudiantes', 'Total Actividades', 'Promedio'],
+        filas_cursos,
+    ),
+    'actividades': (
+        "Actividades",
+        ['ID', 'Nombre', 'Tipo', 'Curso', 'Código Curso',
+         'Fecha Entrega', 'Porcentaje (%)', 'Estado'],
+        filas_actividades,
+    ),
+    'reporte_completo': (
+        "Reporte Completo",
+        ['Curso', 'Código', 'Estudiante', 'Nota Final',
+         'Estado', 'Actividades del Curso'],
+        filas_reporte_completo,
+    ),
+    'docentes': (
+        "Docentes",
+        ['ID', 'Docente', 'Cursos', 'Nombres de Cursos', 'Total Estudiantes', 'Total Actividades',
+         *[tipo for _, tipo in Actividad.TIPO_CHOICES], 'Promedio', 'Aprobación (%)'],
+        filas_docentes,
+    ),
+}
+
+
+def contar_filas(tipo, id_curso=None):
+    """Filas que tendrá la exportación, con un COUNT por hoja y sin generarlas"""
+    if tipo == 'libro_completo':
+        return sum(contar_filas(t, id_curso) for t in HOJAS)
+    
+    if tipo in ('estudiantes', 'actividades'):
+        consulta = (Estudiante if tipo == 'estudiantes' else Actividad).objects.all()
+        if id_curso:
+            consulta = consulta.filter(id_curso=id_curso)
+    elif tipo == 'cursos':
+        consulta = Curso.objects.all()
+    elif tipo == 'reporte_completo':
+        consulta = Estudiante.objects.filter(id_curso__estado='Activo')
+    else:
+        consulta = Docente.objects.all()
+    return consulta.count()
+
+
+# ==========================================
+# ESCRITURA DE HOJAS
+# ==========================================
+
+def anchos_columnas(headers, filas):
+    """Ancho de cada columna según su valor más largo en filas (máximo ANCHO_MAXIMO)"""
+    anchos = []
+    for indice, header in enumerate(headers):
+        max_length = max(
+            [len(str(header))] + [len(str(f[indice])) for f in filas if f[indice]]
+        )
+        anchos.append(min(max_length + 2, ANCHO_MAXIMO))
+    return anchos
+
+
+def _con_muestra(filas):
+    """(muestra, filas): las primeras MUESTRA_ANCHOS filas para los anchos y un iterador con todas"""
+    filas = iter(filas)
+    muestra = list(islice(filas, MUESTRA_ANCHOS))
+    return muestra, chain(muestra, filas)
+
+
+def escribir_hoja(ws, titulo, headers, filas):
+    """Llena una hoja normal: encabezado con estilo, filas, anchos y pie"""
+    from openpyxl.utils import get_column_letter
+    
+    ws.title = titulo
+    ws.append(headers)
+    
+    for cell in ws[1]:
+        _aplicar_estilo_encabezado(cell)
+    
+    muestra, filas = _con_muestra(filas)
+    total = 0
+    for fila in filas:
+        ws.append(fila)
+        total += 1
+    
+    for indice, ancho in enumerate(anchos_columnas(headers, muestra), start=1):
+        ws.column_dimensions[get_column_letter(indice)].width = ancho
+    
+    escribir_pie(ws, total)
+
+
+def escribir_pie(ws, total):
+    """Pie de página con información del reporte"""
+    ws.append([])
+    ws.append(['Reporte generado:', datetime.now().strftime('%d/%m/%Y %H:%M:%S')])
+    ws.append(['Sistema:', 'Plataforma de Gestión Académica - Django'])
+    ws.append(['Total de registros:', total])
+
+
+def _escribir_hoja_streaming(wb, titulo, headers, filas, pie=False):
+    """Igual que escribir_hoja pero sobre un libro write_only; devuelve cuántas filas escribió"""
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.utils import get_column_letter
+    
+    ws = wb.create_sheet(titulo)
+    
+    # write_only exige los anchos antes de la primera fila
+    muestra, filas = _con_muestra(filas)
+    for indice, ancho in enumerate(anchos_columnas(headers, muestra), start=1):
+        ws.column_dimensions[get_column_letter(indice)].width = ancho
+    
+    encabezado = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        _aplicar_estilo_encabezado(cell)
+        encabezado.append(cell)
+    ws.append(encabezado)
+    
+    total = 0
+    for fila in filas:
+        ws.append(fila)
+        total += 1
+    if pie:
+        escribir_pie(ws, total)
+    return total
+
+
+def generar_libro(tipo, id_curso=None):
+    """Libro de una sola hoja para el tipo indicado"""
+    from openpyxl import Workbook
+    
+    titulo, headers, generar_filas = HOJAS[tipo]
+    wb = Workbook()
+    escribir_hoja(wb.active, titulo, headers, generar_filas(id_curso))
+    return wb
+
+
+# ==========================================
+# LIBRO COMPLETO (HOJAS EN PARALELO)
+# ==========================================
+
+def _generar_filas(tipo, id_curso):
+    """[filas] del tipo"""
+    return list(HOJAS[tipo][2](id_curso))
+
+
+def _volcar_filas(tipo, id_curso):
+    """Archivo temporal con las filas del tipo (una por pickle), listo para _leer_filas"""
+    archivo = tempfile.TemporaryFile()
+    try:
+        for fila in HOJAS[tipo][2](id_curso):
+            pickle.dump(fila, archivo, protocol=pickle.HIGHEST_PROTOCOL)
+    except BaseException:
+        archivo.close()
+        raise
+    archivo.seek(0)
+    return archivo
+
+
+def _leer_filas(archivo):
+    while True:
+        try:
+            yield pickle.load(archivo)
+        except EOFError:
+            return
+
+
+def _en_hilo(funcion, tipo, id_curso):
+    """Corre en un hilo del pool; cierra su conexión propia al terminar"""
+    try:
+        return funcion(tipo, id_curso)
+    finally:
+        connections.close_all()
+
+
+def _en_paralelo(funcion, tipos, id_curso):
+    """{tipo: funcion(tipo, id_curso)}, un tipo por hilo del pool"""
+    max_workers = getattr(settings, 'EXPORTACION_MAX_WORKERS', 4)
+    if max_workers <= 1:
+        return {tipo: funcion(tipo, id_curso) for tipo in tipos}
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tipos))) as pool:
+        futuros = {tipo: pool.submit(_en_hilo, funcion, tipo, id_curso) for tipo in tipos}
+    
+    errores = [futuro.exception() for futuro in futuros.values() if futuro.exception()]
+    if errores:
+        # No dejar abiertos los temporales de los tipos que sí terminaron
+        for futuro in futuros.values():
+            if not futuro.exception() and hasattr(futuro.result(), 'close'):
+                futuro.result().close()
+        raise errores[0]
+    return {tipo: futuro.result() for tipo, futuro in futuros.items()}
+
+
+def generar_filas_en_paralelo(tipos, id_curso=None):
+    """{tipo: [filas]}, generando cada tipo en un hilo del pool (las filas quedan en memoria)"""
+    return _en_paralelo(_generar_filas, tipos, id_curso)
+
+
+def volcar_filas_en_paralelo(tipos, id_curso=None):
+    """{tipo: archivo temporal con sus filas}, generando cada tipo en un hilo del pool"""
+    return _en_paralelo(_volcar_filas, tipos, id_curso)
+
+
+def generar_libro_completo(id_curso=None):
+    """
+    Libro completo guardado en un archivo temporal (borrado al cerrarse)
+    listo para enviarse por partes.
+    """
+    return _guardar_temporal(_libro_completo(id_curso))
+
+
+def _libro_completo(id_curso=None, write_only=False):
+    """
+    Libro write_only con una hoja por tipo más una hoja de resumen. Las
+    hojas se generan en paralelo; con write_only (exportaciones grandes)
+    cada hilo vuelca sus filas a un temporal en vez de tenerlas en memoria.
+    """
+    from openpyxl import Workbook
+    
+    if write_only:
+        archivos = volcar_filas_en_paralelo(list(HOJAS), id_curso)
+        filas_por_tipo = {tipo: _leer_filas(archivo) for tipo, archivo in archivos.items()}
+    else:
+        archivos = {}
+        filas_por_tipo = generar_filas_en_paralelo(list(HOJAS), id_curso)
+    
+    wb = Workbook(write_only=True)
+    # Primera hoja del libro, pero se llena al final con los totales escritos
+    resumen = wb.create_sheet("Resumen")
+    
+    try:
+        totales = {
+            tipo: _escribir_hoja_streaming(wb, titulo, headers, filas_por_tipo[tipo])
+            for tipo, (titulo, headers, _) in HOJAS.items()
+        }
+    finally:
+        for archivo in archivos.values():
+            archivo.close()
+    
+    resumen.append(['Hoja', 'Total de registros'])
+    for tipo, (titulo, _, _) in HOJAS.items():
+        resumen.append([titulo, totales[tipo]])
+    resumen.append([])
+    resumen.append(['Reporte generado:', datetime.now().strftime('%d/%m/%Y %H:%M:%S')])
+    resumen.append(['Sistema:', 'Plataforma de Gestión Académica - Django'])
+    
+    return wb
+
+
+def _guardar_temporal(wb):
+    archivo = tempfile.TemporaryFile()
+    wb.save(archivo)
+    archivo.seek(0)
+    return archivo
+
+
+# ==========================================
+# LIBROS GENERADOS BAJO DEMANDA
+# ==========================================
+
+def directorio_generadas():
+    """Fuera de MEDIA_ROOT: lo que hay ahí se sirve públicamente en /media/"""
+    return Path(settings.EXPORTACION_GENERADAS_DIR)
+
+
+def liberar_generado(ruta):
+    """
+    Borra el libro cuando todas las peticiones coalescidas del proceso ya lo
+    abrieron. Con COALESCENCIA_CACHE otros procesos pueden seguir esperando
+    la misma ruta, así que ahí lo borra _limpiar_generadas.
+    """
+    if getattr(settings, 'COALESCENCIA_CACHE', None):
+        return
+    try:
+        os.unlink(ruta)
+    except FileNotFoundError:
+        pass
+
+
+def _limpiar_generadas(carpeta):
+    """Borra los libros abandonados que ninguna petición coalescida puede seguir esperando"""
+    limite = time.time() - max(getattr(settings, 'COALESCENCIA_ESPERA_MAXIMA', 120), 60)
+    for ruta in carpeta.glob('*.xlsx'):
+        try:
+            if ruta.stat().st_mtime < limite:
+                ruta.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _libro_streaming(tipo, id_curso=None):
+    """Libro de una hoja en modo write_only: openpyxl no retiene objetos de celda"""
+    from openpyxl import Workbook
+    
+    titulo, headers, generar_filas = HOJAS[tipo]
+    wb = Workbook(write_only=True)
+    _escribir_hoja_streaming(wb, titulo, headers, generar_filas(id_curso), pie=True)
+    return wb
+
+
+def generar_excel(tipo, id_curso=None, write_only=False):
+    """
+    Escribe el .xlsx del tipo pedido en directorio_generadas() y devuelve su
+    ruta. write_only (exportaciones sobre EXPORTACION_FILAS_STREAMING)
+    escribe las filas de la consulta al archivo sin acumularlas en memoria.
+    Entre peticiones coalescidas (y en COALESCENCIA_CACHE) se comparte la
+    ruta, no el contenido: cada petición abre el archivo y lo envía por
+    partes. liberar_generado lo borra cuando todas lo abrieron (un archivo
+    abierto sigue legible después de borrado); los que queden se borran al
+    superar COALESCENCIA_ESPERA_MAXIMA.
+    """
+    carpeta = directorio_generadas()
+    carpeta.mkdir(parents=True, exist_ok=True)
+    _limpiar_generadas(carpeta)
+    
+    descriptor, ruta = tempfile.mkstemp(dir=carpeta, prefix=f'{tipo}_', suffix='.xlsx')
+    try:
+        with os.fdopen(descriptor, 'wb') as archivo:
+            if tipo == 'libro_completo':
+                _libro_completo(id_curso, write_only=write_only).save(archivo)
+            elif write_only:
+                _libro_streaming(tipo, id_curso).save(archivo)
+            else:
+                generar_libro(tipo, id_curso).save(archivo)
+    except BaseException:
+        os.unlink(ruta)
+        raise
+    return Path(ruta)
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from academic.exportacion import HOJAS, contar_filas, generar_excel
+from academic.memoria import medir_pico
+
+
+class Command(BaseCommand):
+    help = 'Pico de memoria (tracemalloc) por exportación, en memoria y write_only, por cada 10k filas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tipos', nargs='+', default=[*HOJAS, 'libro_completo'])
+        parser.add_argument('--id-curso', type=int, default=None)
+
+    def handle(self, *args, **options):
+        id_curso = options['id_curso']
+        self.stdout.write(
+            f'{"tipo":<18} {"filas":>8} {"en memoria MB":>14} {"write_only MB":>14} {"MB/10k filas":>13}'
+        )
+
+        for tipo in options['tipos']:
+            filas = contar_filas(tipo, id_curso)
+            # Primera pasada sin medir: imports de openpyxl y caches de la conexión
+            generar_excel(tipo, id_curso, write_only=True).unlink()
+            ruta, pico_memoria = medir_pico(lambda: generar_excel(tipo, id_curso))
+            ruta.unlink()
+            ruta, pico_archivo = medir_pico(lambda: generar_excel(tipo, id_curso, write_only=True))
+            ruta.unlink()
+            por_10k = pico_archivo / filas * 10000 if filas else 0
+
+            self.stdout.write(
+                f'{tipo:<18} {filas:>8} '
+                f'{pico_memoria / 2**20:>14.1f} {pico_archivo / 2**20:>14.1f} {por_10k / 2**20:>13.2f}'
+            )
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from academic.models import Estudiante, Actividad
+from academic.serializers import (
+    EstudianteSerializer, ActividadSerializer,
+    serializar_estudiantes, serializar_actividades
+)
+
+
+class Command(BaseCommand):
+    help = 'Compara la serialización DRF con la ruta rápida de los listados'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=5)
+
+    def handle(self, *args, **options):
+        repeticiones = options['repeticiones']
+        casos = [
+            ('estudiantes', Estudiante.objects.all(), EstudianteSerializer, serializar_estudiantes),
+            ('actividades', Actividad.objects.order_by('-fecha_entrega'), ActividadSerializer, serializar_actividades),
+        ]
+
+        for nombre, queryset, serializer_class, serializar in casos:
+            drf = serializer_class(queryset.all(), many=True).data
+            rapido = serializar(queryset.all())
+            if [dict(fila) for fila in drf] != rapido:
+                self.stderr.write(self.style.ERROR(f'{nombre}: la salida no coincide con el serializer'))
+                continue
+
+            tiempo_drf = self._medir(lambda: serializer_class(queryset.all(), many=True).data, repeticiones)
+            tiempo_rapido = self._medir(lambda: serializar(queryset.all()), repeticiones)
+
+            self.stdout.write(
+                f'{nombre}: {len(rapido)} filas | '
+                f'DRF {tiempo_drf * 1000:.1f} ms | '
+                f'rápido {tiempo_rapido * 1000:.1f} ms | '
+                f'x{tiempo_drf / tiempo_rapido if tiempo_rapido else 0:.1f}'
+            )
+
+    def _medir(self, funcion, repeticiones):
+        """Mejor tiempo de varias repeticiones"""
+        mejor = None
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            funcion()
+            duracion = time.perf_counter() - inicio
+            mejor = duracion if mejor is None else min(mejor, duracion)
+        return mejor
@@ -0,0 +1,166 @@
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from academic.models import Docente, Curso, Estudiante, Actividad, Calificacion
+
+# escala -> (docentes, cursos, estudiantes, actividades por curso)
+ESCALAS = {
+    'pequena': (20, 50, 2000, 8),
+    'mediana': (200, 500, 50000, 12),
+    'grande': (2000, 5000, 1000000, 15),
+}
+
+NOMBRES = ['Ana', 'Luis', 'Marta', 'Carlos', 'Sofía', 'Pedro', 'Laura', 'Andrés',
+           'Valentina', 'Juan', 'Camila', 'Diego', 'Daniela', 'Felipe', 'Paula']
+APELLIDOS = ['Gómez', 'Rodríguez', 'Martínez', 'López', 'García', 'Pérez',
+             'Sánchez', 'Ramírez', 'Torres', 'Díaz', 'Vargas', 'Castro']
+MATERIAS = ['Cálculo', 'Física', 'Programación', 'Bases de Datos', 'Química',
+            'Estadística', 'Redes', 'Álgebra', 'Inglés', 'Economía']
+TIPOS = [tipo for tipo, _ in Actividad.TIPO_CHOICES]
+
+MODELOS = [Docente, Curso, Estudiante, Actividad, Calificacion]
+
+
+class Command(BaseCommand):
+    help = 'Genera datos sintéticos deterministas (misma semilla = mismos datos) con inserciones en bloque'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escala', choices=ESCALAS, default='pequena')
+        parser.add_argument('--estudiantes', type=int, help='Sobrescribe el número de estudiantes de la escala')
+        parser.add_argument('--semilla', type=int, default=42)
+        parser.add_argument('--calificaciones', action='store_true',
+                            help='Genera también una calificación por estudiante y actividad de su curso')
+        parser.add_argument('--crear-tablas', action='store_true',
+                            help='Crea las tablas que falten (base local vacía)')
+        parser.add_argument('--limpiar', action='store_true', help='Borra los datos existentes antes de generar')
+        parser.add_argument('--lote', type=int, default=5000, help='Tamaño de lote de bulk_create')
+        parser.add_argument('--permitir-remota', action='store_true',
+                            help='Permite escribir en una base que no es SQLite local (p. ej. el MySQL remoto)')
+
+    def handle(self, *args, **options):
+        # Pensado para bases locales (DB_LOCAL): nunca borrar ni llenar el MySQL por descuido
+        if connection.vendor != 'sqlite' and not options['permitir_remota']:
+            raise CommandError(
+                f'La base configurada es {connection.vendor}, no una base local: '
+                'use DB_LOCAL=archivo.sqlite3 o --permitir-remota'
+            )
+
+        num_docentes, num_cursos, num_estudiantes, actividades_por_curso = ESCALAS[options['escala']]
+        num_estudiantes = options['estudiantes'] or num_estudiantes
+        self.lote = options['lote']
+        rnd = random.Random(options['semilla'])
+
+        if options['crear_tablas']:
+            self._crear_tablas()
+        if options['limpiar']:
+            for modelo in reversed(MODELOS):
+                modelo.objects.all().delete()
+        elif any(modelo.objects.exists() for modelo in MODELOS[:4]):
+            raise CommandError('La base ya tiene datos: use --limpiar para reemplazarlos')
+
+        inicio = time.perf_counter()
+        # Las claves primarias se asignan explícitamente: así las FK no dependen
+        # de que la base devuelva los ids de bulk_create y el resultado es reproducible
+        self._insertar(Docente, (
+            Docente(
+                id_docente=i,
+                nombre=self._nombre(rnd),
+                correo=f'docente{i}@universidad.edu.co',
+                telefono=f'3{rnd.randint(100000000, 199999999)}',
+            )
+            for i in range(1, num_docentes + 1)
+        ))
+        self._insertar(Curso, (
+            Curso(
+                id_curso=i,
+                nombre=f'{MATERIAS[i % len(MATERIAS)]} {i}',
+                codigo=f'{MATERIAS[i % len(MATERIAS)][:3].upper()}{i:04d}',
+                descripcion=f'Curso sintético {i}',
+                estado='Activo' if rnd.random() < 0.85 else 'Pendiente',
+                id_docente_id=rnd.randint(1, num_docentes),
+            )
+            for i in range(1, num_cursos + 1)
+        ))
+
+        cursos_estudiante = [rnd.randint(1, num_cursos) for _ in range(num_estudiantes)]
+        self._insertar(Estudiante, (
+            Estudiante(
+                id_estudiante=i,
+                nombre=self._nombre(rnd),
+                id_curso_id=id_curso,
+                nota_final=None if rnd.random() < 0.1 else Decimal(rnd.randint(0, 50)) / 10,
+            )
+            for i, id_curso in enumerate(cursos_estudiante, start=1)
+        ))
+
+        inicio_periodo = date(2025, 1, 20)
+        actividades_curso = {}
+        filas_actividades = []
+        for id_curso in range(1, num_cursos + 1):
+            pesos = self._porcentajes(rnd, actividades_por_curso)
+            for j, porcentaje in enumerate(pesos):
+                id_actividad = len(filas_actividades) + 1
+                actividades_curso.setdefault(id_curso, []).append(id_actividad)
+                entrega = inicio_periodo + timedelta(days=rnd.randint(0, 150))
+                filas_actividades.append(Actividad(
+                    id_actividad=id_actividad,
+                    nombre=f'{TIPOS[j % len(TIPOS)]} {j + 1}',
+                    tipo=TIPOS[j % len(TIPOS)],
+                    fecha_entrega=entrega,
+                    porcentaje=porcentaje,
+                    estado='Pendiente' if rnd.random() < 0.3 else 'Activo',
+                    id_curso_id=id_curso,
+                ))
+        self._insertar(Actividad, filas_actividades)
+
+        if options['calificaciones']:
+            self._insertar(Calificacion, (
+                Calificacion(
+                    id_estudiante_id=id_estudiante,
+                    id_actividad_id=id_actividad,
+                    nota=Decimal(rnd.randint(0, 50)) / 10,
+                )
+                for id_estudiante, id_curso in enumerate(cursos_estudiante, start=1)
+                for id_actividad in actividades_curso[id_curso]
+            ))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Datos generados en {time.perf_counter() - inicio:.1f} s '
+            f'(escala {options["escala"]}, semilla {options["semilla"]})'
+        ))
+
+    def _nombre(self, rnd):
+        return f'{rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)} {rnd.choice(APELLIDOS)}'
+
+    def _porcentajes(self, rnd, cantidad):
+        """Porcentajes enteros positivos que suman 100"""
+        cortes = sorted(rnd.sample(range(1, 100), cantidad - 1))
+        return [b - a for a, b in zip([0] + cortes, cortes + [100])]
+
+    def _insertar(self, modelo, objetos):
+        total = 0
+        lote = []
+        with transaction.atomic():
+            for objeto in objetos:
+                lote.append(objeto)
+                if len(lote) >= self.lote:
+                    modelo.objects.bulk_create(lote)
+                    total += len(lote)
+                    lote = []
+            if lote:
+                modelo.objects.bulk_create(lote)
+                total += len(lote)
+        self.stdout.write(f'{modelo._meta.verbose_name_plural}: {total}')
+
+    def _crear_tablas(self):
+        existentes = set(connection.introspection.table_names())
+        with connection.schema_editor() as editor:
+            for modelo in MODELOS:
+                if modelo._meta.db_table not in existentes:
+                    editor.create_model(modelo)
+                    self.stdout.write(f'Tabla creada: {modelo._meta.db_table}')
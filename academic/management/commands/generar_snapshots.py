@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from academic.snapshots import actualizar_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Pregenera los snapshots de exportación a Excel en MEDIA_ROOT/exportaciones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--forzar', action='store_true',
+            help='Regenera todos los snapshots aunque sus tablas no hayan cambiado'
+        )
+        parser.add_argument(
+            '--cada', type=int, default=0, metavar='SEGUNDOS',
+            help='Repite la generación cada N segundos (programador simple sin cron)'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            inicio = time.perf_counter()
+            resultados = actualizar_snapshots(forzar=options['forzar'])
+            generados = sum(1 for _, estado in resultados if estado == 'generado')
+
+            for nombre, estado in resultados:
+                self.stdout.write(f'{nombre}: {estado}')
+            self.stdout.write(self.style.SUCCESS(
+                f'{generados} de {len(resultados)} snapshots generados '
+                f'en {time.perf_counter() - inicio:.1f} s'
+            ))
+
+            if options['cada'] <= 0:
+                break
+            time.sleep(options['cada'])
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from academic.arranque import MODULOS_DIFERIDOS, medir_arranque
+
+
+class Command(BaseCommand):
+    help = 'Mide el arranque en frío de un worker (tiempo de importación y memoria)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=15, help='Paquetes más costosos a mostrar')
+
+    def handle(self, *args, **options):
+        resultado = medir_arranque()
+
+        self.stdout.write(f'{"paquete":<30} {"ms":>8}')
+        ordenados = sorted(resultado['por_paquete'].items(), key=lambda p: p[1], reverse=True)
+        for paquete, microsegundos in ordenados[:options['top']]:
+            self.stdout.write(f'{paquete:<30} {microsegundos / 1000:>8.1f}')
+
+        cargados = [m for m in MODULOS_DIFERIDOS if m in resultado['modulos']]
+        self.stdout.write(
+            f'\nArranque: {resultado["segundos"] * 1000:.0f} ms | '
+            f'RSS máx: {resultado["rss_kb"] / 1024:.1f} MB | '
+            f'módulos: {len(resultado["modulos"])}'
+        )
+        if cargados:
+            self.stdout.write(self.style.WARNING(
+                f'Dependencias pesadas cargadas al arrancar: {", ".join(cargados)}'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS('Ninguna dependencia pesada se carga al arrancar'))
@@ -0,0 +1,150 @@
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Max, Min
+from django.test import Client
+
+from academic.models import Estudiante, Actividad
+
+# Mezcla de llamadas que hace static/js/script.js: (nombre, peso, pasos).
+# Cada paso es (método, ruta, cuerpo); {estudiante}/{actividad} se
+# reemplazan por ids al azar. Las escrituras reproducen "guardar
+# estudiante", que luego recarga el listado y las estadísticas generales.
+MEZCLA = [
+    ('dashboard', 15, [('GET', '/api/reportes/?action=general', None)]),
+    ('listar_cursos', 15, [('GET', '/api/cursos/', None)]),
+    ('listar_estudiantes', 15, [('GET', '/api/estudiantes/', None)]),
+    ('listar_actividades', 10, [('GET', '/api/actividades/', None)]),
+    ('ver_estudiante', 10, [('GET', '/api/estudiantes/{estudiante}/', None)]),
+    ('ver_actividad', 5, [('GET', '/api/actividades/{actividad}/', None)]),
+    ('reportes', 10, [
+        ('GET', '/api/reportes/?action=estudiantes_por_curso', None),
+        ('GET', '/api/reportes/?action=rendimiento', None),
+        ('GET', '/api/reportes/?action=cursos_estadisticas', None),
+        ('GET', '/api/reportes/?action=top_estudiantes', None),
+    ]),
+]
+ESCRITURAS = [
+    ('guardar_estudiante', 5, [
+        ('POST', '/api/estudiantes/', {'nombre': 'Carga', 'id_curso': None, 'nota_final': '3.5'}),
+        ('GET', '/api/estudiantes/', None),
+        ('GET', '/api/reportes/?action=general', None),
+    ]),
+]
+
+
+def percentil(valores_ordenados, p):
+    if not valores_ordenados:
+        return 0.0
+    indice = min(len(valores_ordenados) - 1, int(round(p / 100 * (len(valores_ordenados) - 1))))
+    return valores_ordenados[indice]
+
+
+class Command(BaseCommand):
+    help = 'Reproduce la mezcla de llamadas del frontend con concurrencia configurable y reporta latencias'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help='Servidor a probar (p. ej. http://127.0.0.1:8000); sin él se usa el cliente de pruebas en proceso')
+        parser.add_argument('--concurrencia', type=int, default=10)
+        parser.add_argument('--duracion', type=float, default=30, help='Segundos de prueba')
+        parser.add_argument('--semilla', type=int, default=42)
+        parser.add_argument('--escrituras', action='store_true', help='Incluye altas de estudiantes (modifica la base)')
+        parser.add_argument('--permitir-remota', action='store_true',
+                            help='Permite la prueba en proceso contra una base que no es SQLite local')
+
+    def handle(self, *args, **options):
+        self.url = (options['url'] or '').rstrip('/')
+        # En proceso la carga cae sobre DATABASES['default'], por defecto el MySQL remoto
+        if not self.url and connection.vendor != 'sqlite' and not options['permitir_remota']:
+            raise CommandError(
+                f'La base configurada es {connection.vendor}, no una base local: '
+                'use DB_LOCAL=archivo.sqlite3, --url o --permitir-remota'
+            )
+        mezcla = MEZCLA + (ESCRITURAS if options['escrituras'] else [])
+        self.rangos = {
+            'estudiante': self._rango(Estudiante),
+            'actividad': self._rango(Actividad),
+        }
+
+        latencias = defaultdict(list)
+        errores = defaultdict(int)
+        lock = threading.Lock()
+        fin = time.monotonic() + options['duracion']
+
+        def usuario(numero):
+            rnd = random.Random(options['semilla'] + numero)
+            cliente = None if self.url else Client()
+            nombres = [nombre for nombre, _, _ in mezcla]
+            pesos = [peso for _, peso, _ in mezcla]
+            pasos_por_nombre = {nombre: pasos for nombre, _, pasos in mezcla}
+            while time.monotonic() < fin:
+                for metodo, ruta, cuerpo in pasos_por_nombre[rnd.choices(nombres, pesos)[0]]:
+                    ruta = ruta.format(**{k: rnd.randint(*r) for k, r in self.rangos.items()})
+                    inicio = time.perf_counter()
+                    ok = self._peticion(cliente, metodo, ruta, cuerpo)
+                    duracion = time.perf_counter() - inicio
+                    endpoint = f'{metodo} {self._normalizar(ruta)}'
+                    with lock:
+                        latencias[endpoint].append(duracion)
+                        if not ok:
+                            errores[endpoint] += 1
+
+        inicio = time.monotonic()
+        hilos = [threading.Thread(target=usuario, args=(i,)) for i in range(options['concurrencia'])]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        self._reporte(latencias, errores, time.monotonic() - inicio)
+
+    def _rango(self, modelo):
+        limites = modelo.objects.aggregate(minimo=Min('pk'), maximo=Max('pk'))
+        if limites['minimo'] is None:
+            raise CommandError(f'No hay {modelo._meta.verbose_name_plural}: ejecute generar_datos primero')
+        return limites['minimo'], limites['maximo']
+
+    def _normalizar(self, ruta):
+        """Agrupa /api/estudiantes/123/ como /api/estudiantes/{id}/"""
+        return '/'.join('{id}' if parte.isdigit() else parte for parte in ruta.split('/'))
+
+    def _peticion(self, cliente, metodo, ruta, cuerpo):
+        datos = json.dumps(cuerpo) if cuerpo is not None else None
+        if cliente is not None:
+            respuesta = cliente.generic(metodo, ruta, datos or '', content_type='application/json')
+            return respuesta.status_code < 400
+
+        solicitud = urllib.request.Request(
+            self.url + ruta, data=datos.encode() if datos else None, method=metodo,
+            headers={'Content-Type': 'application/json'}
+        )
+        try:
+            with urllib.request.urlopen(solicitud, timeout=60) as respuesta:
+                respuesta.read()
+                return True
+        except (urllib.error.URLError, TimeoutError):
+            return False
+
+    def _reporte(self, latencias, errores, duracion):
+        total = sum(len(v) for v in latencias.values())
+        self.stdout.write(
+            f'{"endpoint":<48} {"peticiones":>10} {"errores":>8} {"req/s":>8} '
+            f'{"p50 ms":>8} {"p90 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"max ms":>8}'
+        )
+        for endpoint in sorted(latencias):
+            valores = sorted(latencias[endpoint])
+            self.stdout.write(
+                f'{endpoint:<48} {len(valores):>10} {errores[endpoint]:>8} '
+                f'{len(valores) / duracion:>8.1f} '
+                + ' '.join(f'{percentil(valores, p) * 1000:>8.1f}' for p in (50, 90, 95, 99))
+                + f' {valores[-1] * 1000:>8.1f}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} peticiones en {duracion:.1f} s ({total / duracion:.1f} req/s)'
+        ))
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from academic.planes import RUTA_BASE, cargar_base, comparar, guardar_base, revisar
+
+
+class Command(BaseCommand):
+    help = (
+        'Pasa por EXPLAIN las consultas de reportes, exportaciones y viewsets y '
+        'falla si aparecen recorridos completos, filesorts o tablas temporales '
+        'que no están en la línea base'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base', default=str(RUTA_BASE), help='Archivo JSON de línea base')
+        parser.add_argument(
+            '--actualizar', action='store_true',
+            help='Guarda los planes actuales como nueva línea base del motor en uso'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            planes = revisar()
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['actualizar']:
+            guardar_base(planes, options['base'])
+            self.stdout.write(self.style.SUCCESS(
+                f'Línea base de {connection.vendor} actualizada: {len(planes)} escenarios'
+            ))
+            return
+
+        base = cargar_base(options['base']).get(connection.vendor)
+        if base is None:
+            raise CommandError(
+                f'No hay línea base para {connection.vendor}; genérela con --actualizar'
+            )
+
+        regresiones = 0
+        for nombre, nuevos, resueltos in comparar(planes, base):
+            for hallazgo in nuevos:
+                regresiones += 1
+                self.stdout.write(self.style.ERROR(f'{nombre}: nuevo {hallazgo}'))
+            for hallazgo in resueltos:
+                self.stdout.write(self.style.SUCCESS(f'{nombre}: ya no hay {hallazgo}'))
+
+        if regresiones:
+            raise CommandError(f'{regresiones} regresiones de plan en {connection.vendor}')
+        self.stdout.write(self.style.SUCCESS(f'{len(planes)} escenarios sin regresiones de plan'))
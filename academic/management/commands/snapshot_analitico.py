@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from academic.analitica import tomar_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Copia las tablas académicas al almacén analítico (Parquet en ANALITICA_DIR)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--periodo', help='Periodo académico del snapshot (por defecto según la fecha, p. ej. 2025-2)')
+        parser.add_argument(
+            '--cada', type=int, default=0, metavar='SEGUNDOS',
+            help='Repite el snapshot cada N segundos (programador simple sin cron)'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            inicio = time.perf_counter()
+            resultado = tomar_snapshot(periodo=options['periodo'])
+            filas = ', '.join(f'{tabla}: {total}' for tabla, total in resultado['filas'].items())
+            self.stdout.write(self.style.SUCCESS(
+                f'Snapshot {resultado["snapshot_id"]} (periodo {resultado["periodo"]}) '
+                f'en {time.perf_counter() - inicio:.1f} s | {filas}'
+            ))
+
+            if options['cada'] <= 0:
+                break
+            time.sleep(options['cada'])
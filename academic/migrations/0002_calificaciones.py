@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Calificacion',
+            fields=[
+                ('id_calificacion', models.AutoField(primary_key=True, serialize=False)),
+                ('nota', models.DecimalField(decimal_places=1, max_digits=3)),
+                ('id_actividad', models.ForeignKey(db_column='id_actividad', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='academic.actividad')),
+                ('id_estudiante', models.ForeignKey(db_column='id_estudiante', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='academic.estudiante')),
+            ],
+            options={
+                'verbose_name': 'Calificación',
+                'verbose_name_plural': 'Calificaciones',
+                'db_table': 'calificaciones',
+                'constraints': [models.UniqueConstraint(fields=('id_estudiante', 'id_actividad'), name='calificacion_estudiante_actividad_unica')],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+
+# Los modelos son managed = False, así que Django no crea sus índices: esta
+# migración los agrega solo si la tabla existe y el índice todavía no.
+INDICES = [
+    ('Curso', models.Index(fields=['nombre'], name='cursos_nombre_idx')),
+    ('Curso', models.Index(fields=['codigo'], name='cursos_codigo_idx')),
+    ('Estudiante', models.Index(fields=['nombre'], name='estudiantes_nombre_idx')),
+    ('Actividad', models.Index(fields=['nombre'], name='actividades_nombre_idx')),
+]
+
+
+def _indices_pendientes(apps, schema_editor, existentes):
+    connection = schema_editor.connection
+    tablas = set(connection.introspection.table_names())
+    for nombre_modelo, indice in INDICES:
+        modelo = apps.get_model('academic', nombre_modelo)
+        tabla = modelo._meta.db_table
+        if tabla not in tablas:
+            continue
+        with connection.cursor() as cursor:
+            restricciones = connection.introspection.get_constraints(cursor, tabla)
+        if (indice.name in restricciones) == existentes:
+            yield modelo, indice
+
+
+def crear_indices(apps, schema_editor):
+    for modelo, indice in list(_indices_pendientes(apps, schema_editor, existentes=False)):
+        schema_editor.add_index(modelo, indice)
+
+
+def eliminar_indices(apps, schema_editor):
+    for modelo, indice in list(_indices_pendientes(apps, schema_editor, existentes=True)):
+        schema_editor.remove_index(modelo, indice)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0002_calificaciones'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices, eliminar_indices),
+    ]
@@ -0,0 +1,48 @@
+from django.db import migrations
+
+
+# Índices para el calendario de actividades y el conteo de pendientes.
+# Las tablas son managed = False y el estado de migraciones no registra sus
+# FK (id_curso), así que los índices se crean con SQL por nombre de columna,
+# solo si la tabla existe y el índice todavía no.
+INDICES = [
+    ('actividades', 'actividades_calendario_idx', ['fecha_entrega', 'estado', 'id_curso']),
+    ('actividades', 'actividades_estado_idx', ['estado', 'fecha_entrega', 'id_curso']),
+]
+
+
+def _indices(schema_editor, existentes):
+    connection = schema_editor.connection
+    tablas = set(connection.introspection.table_names())
+    for tabla, nombre, columnas in INDICES:
+        if tabla not in tablas:
+            continue
+        with connection.cursor() as cursor:
+            restricciones = connection.introspection.get_constraints(cursor, tabla)
+        if (nombre in restricciones) == existentes:
+            yield tabla, nombre, columnas
+
+
+def crear_indices(apps, schema_editor):
+    q = schema_editor.quote_name
+    for tabla, nombre, columnas in list(_indices(schema_editor, existentes=False)):
+        schema_editor.execute(
+            f"CREATE INDEX {q(nombre)} ON {q(tabla)} ({', '.join(q(c) for c in columnas)})"
+        )
+
+
+def eliminar_indices(apps, schema_editor):
+    q = schema_editor.quote_name
+    for tabla, nombre, _ in list(_indices(schema_editor, existentes=True)):
+        schema_editor.execute(schema_editor.sql_delete_index % {'name': q(nombre), 'table': q(tabla)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0003_indices_busqueda'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices, eliminar_indices),
+    ]
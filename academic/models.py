@@ -69,9 +69,14 @@ class Estudiante(models.Model):
     @property
     def estado(self):
         """Calcula el estado basado en la nota final"""
-        if self.nota_final is None:
-            return 'Sin Calificar'
-        return 'Aprobado' if self.nota_final >= 3.0 else 'Reprobado'
+        return estado_nota(self.nota_final)
+
+
+def estado_nota(nota_final):
+    """Estado de un estudiante según su nota final (sin instanciar el modelo)"""
+    if nota_final is None:
+        return 'Sin Calificar'
+    return 'Aprobado' if nota_final >= 3.0 else 'Reprobado'
 
 
 class Actividad(models.Model):
@@ -109,4 +114,40 @@ class Actividad(models.Model):
         verbose_name_plural = 'Actividades'
     
     def __str__(self):
-        return f"{self.nombre} - {self.tipo}" if self.nombre and self.tipo else f"Actividad {self.id_actividad}"
\ No newline at end of file
+        return f"{self.nombre} - {self.tipo}" if self.nombre and self.tipo else f"Actividad {self.id_actividad}"
+
+
+class Calificacion(models.Model):
+    """
+    Nota de un estudiante en una actividad. A diferencia del resto de tablas,
+    esta la crea Django (migración 0002); las FK no llevan restricción en la
+    base porque las tablas referenciadas se gestionan por fuera.
+    """
+    id_calificacion = models.AutoField(primary_key=True)
+    id_estudiante = models.ForeignKey(
+        Estudiante,
+        on_delete=models.DO_NOTHING,
+        db_column='id_estudiante',
+        db_constraint=False
+    )
+    id_actividad = models.ForeignKey(
+        Actividad,
+        on_delete=models.DO_NOTHING,
+        db_column='id_actividad',
+        db_constraint=False
+    )
+    nota = models.DecimalField(max_digits=3, decimal_places=1)
+    
+    class Meta:
+        db_table = 'calificaciones'
+        verbose_name = 'Calificación'
+        verbose_name_plural = 'Calificaciones'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['id_estudiante', 'id_actividad'],
+                name='calificacion_estudiante_actividad_unica'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.id_estudiante_id} - {self.id_actividad_id}: {self.nota}"
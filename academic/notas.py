@@ -0,0 +1,116 @@
+"""
+Cálculo de notas finales ponderadas a partir de Actividad.porcentaje.
+
+La nota de cada estudiante es la suma de sus calificaciones ponderadas por
+el porcentaje de cada actividad del curso, normalizando por la suma de
+porcentajes (si no suman 100 el resultado sigue en la escala 0-5). Las
+actividades sin calificación cuentan como 0 y los estudiantes sin ninguna
+calificación conservan la nota_final registrada a mano. Un estudiante con
+calificaciones cuya nota ya no se puede calcular (se borró su última
+calificación, su actividad o todas las actividades con porcentaje del
+curso) vuelve a None (Sin Calificar): su nota era derivada y no queda de
+qué calcularla. NumPy se importa al calcular, no al cargar el módulo, para
+no pesar en el arranque.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+
+from .models import Actividad, Calificacion, Estudiante
+
+NOTA_MAXIMA = 5.0
+
+
+def _redondear(notas):
+    """Redondeo a 1 decimal (mitad hacia arriba) dentro de [0, NOTA_MAXIMA]"""
+    import numpy as np
+    
+    return np.clip(np.floor(notas * 10 + 0.5) / 10, 0, NOTA_MAXIMA)
+
+
+def calcular_notas(id_curso, id_estudiante=None):
+    """
+    {id_estudiante: Decimal} con la nota ponderada de los estudiantes del
+    curso (o solo de id_estudiante) que tengan al menos una calificación.
+    """
+    import numpy as np
+    
+    actividades = list(
+        Actividad.objects.filter(id_curso=id_curso, porcentaje__gt=0)
+        .values_list('id_actividad', 'porcentaje')
+    )
+    if not actividades:
+        return {}
+
+    columnas = {id_actividad: j for j, (id_actividad, _) in enumerate(actividades)}
+    pesos = np.array([porcentaje for _, porcentaje in actividades], dtype=float)
+    pesos /= pesos.sum()
+
+    calificaciones = Calificacion.objects.filter(
+        id_actividad__in=list(columnas), id_estudiante__id_curso=id_curso
+    )
+    if id_estudiante is not None:
+        calificaciones = calificaciones.filter(id_estudiante=id_estudiante)
+    filas = list(calificaciones.values_list('id_estudiante', 'id_actividad', 'nota'))
+    if not filas:
+        return {}
+
+    estudiantes = np.fromiter((f[0] for f in filas), dtype=np.int64, count=len(filas))
+    columna = np.fromiter((columnas[f[1]] for f in filas), dtype=np.int64, count=len(filas))
+    notas = np.fromiter((f[2] for f in filas), dtype=float, count=len(filas))
+
+    ids, fila = np.unique(estudiantes, return_inverse=True)
+    finales = _redondear(np.bincount(fila, weights=notas * pesos[columna]))
+
+    return {int(i): Decimal(f'{nota:.1f}') for i, nota in zip(ids, finales)}
+
+
+def recalcular_curso(id_curso):
+    """Recalcula y guarda en bloque la nota_final de todo el curso; devuelve cuántas cambió"""
+    notas = calcular_notas(id_curso)
+    # Con alguna calificación la nota es derivada: None si ya no sale ninguna
+    derivados = set(
+        Calificacion.objects.filter(id_estudiante__id_curso=id_curso)
+        .values_list('id_estudiante', flat=True).distinct()
+    )
+    actuales = dict(
+        Estudiante.objects.filter(id_estudiante__in=list(derivados | set(notas)))
+        .values_list('id_estudiante', 'nota_final')
+    )
+    cambios = [
+        Estudiante(id_estudiante=id_estudiante, nota_final=notas.get(id_estudiante))
+        for id_estudiante, nota_final in actuales.items()
+        if nota_final != notas.get(id_estudiante)
+    ]
+    with transaction.atomic():
+        Estudiante.objects.bulk_update(cambios, ['nota_final'], batch_size=500)
+    return len(cambios)
+
+
+def limpiar_notas(ids_estudiante):
+    """
+    Deja en None la nota de los estudiantes indicados que ya no tienen
+    ninguna calificación (tras borrar su actividad); devuelve cuántos cambió.
+    """
+    return (
+        Estudiante.objects.filter(id_estudiante__in=list(ids_estudiante))
+        .exclude(id_estudiante__in=Calificacion.objects.values('id_estudiante'))
+        .exclude(nota_final=None)
+        .update(nota_final=None)
+    )
+
+
+def recalcular_estudiante(id_estudiante):
+    """
+    Recalcula solo la nota del estudiante (tras cambiar una de sus
+    calificaciones) y devuelve la instancia actualizada.
+    """
+    estudiante = Estudiante.objects.get(pk=id_estudiante)
+    if estudiante.id_curso_id is None:
+        return estudiante
+
+    nota = calcular_notas(estudiante.id_curso_id, id_estudiante).get(id_estudiante)
+    if nota != estudiante.nota_final:
+        estudiante.nota_final = nota
+        estudiante.save(update_fields=['nota_final'])
+    return estudiante
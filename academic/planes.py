@@ -0,0 +1,196 @@
+"""
+Revisión de planes de consulta contra una línea base versionada.
+
+Los modelos son managed = False y los índices dependen de lo que exista en
+el servidor MySQL, así que un índice borrado o una consulta nueva pueden
+degradar un reporte sin que falle ninguna prueba. Aquí se ejecuta cada
+acción de /api/reportes/, cada tipo de /api/exportar/, /api/calendario/ y
+el list/retrieve de los viewsets, se capturan sus SELECT y se pasa cada uno
+por EXPLAIN en la base configurada (normalmente la local). Los hallazgos
+(recorridos completos, ordenamientos en archivo y tablas temporales) se
+comparan con planes_base.json, separado por motor.
+
+La línea base de SQLite se genera sobre una base local con los índices de
+las migraciones (las tablas deben existir antes de 0003/0004):
+
+    DB_LOCAL=planes.sqlite3 python manage.py migrate
+    DB_LOCAL=planes.sqlite3 python manage.py generar_datos --escala pequena --crear-tablas
+    DB_LOCAL=planes.sqlite3 python manage.py migrate academic 0002
+    DB_LOCAL=planes.sqlite3 python manage.py migrate academic
+    DB_LOCAL=planes.sqlite3 python manage.py revisar_planes --actualizar
+"""
+import json
+import re
+import tempfile
+from pathlib import Path
+
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from .clasificaciones import clasificaciones
+from .exportacion import HOJAS
+from .models import Actividad, Curso, Estudiante
+
+RUTA_BASE = Path(__file__).with_name('planes_base.json')
+
+ACCIONES_REPORTES = (
+    'general', 'cursos_estadisticas', 'estudiantes_por_curso', 'rendimiento',
+    'actividades_pendientes', 'top_estudiantes', 'posicion_estudiante',
+    'promedios_mensuales', 'docentes',
+)
+
+VIEWSETS = ('cursos', 'estudiantes', 'actividades', 'calificaciones')
+
+
+def escenarios():
+    """[(nombre, ruta, params)] de todas las lecturas a revisar"""
+    id_curso = Curso.objects.values_list('pk', flat=True).first()
+    id_estudiante = Estudiante.objects.values_list('pk', flat=True).first()
+    por_curso = {'id_curso': id_curso} if id_curso else {}
+
+    resultado = []
+    for accion in ACCIONES_REPORTES:
+        params = {'action': accion}
+        if accion == 'top_estudiantes':
+            params.update(por_curso)
+        elif accion == 'posicion_estudiante' and id_estudiante:
+            params['id_estudiante'] = id_estudiante
+        resultado.append((f'reportes:{accion}', '/api/reportes/', params))
+
+    for tipo in [*HOJAS, 'libro_completo']:
+        resultado.append((f'exportar:{tipo}', '/api/exportar/', {'tipo': tipo}))
+    resultado.append(('exportar:actividades_por_curso', '/api/exportar/', {'tipo': 'actividades', **por_curso}))
+
+    resultado.append(('calendario', '/api/calendario/', {}))
+    resultado.append(('calendario_por_curso', '/api/calendario/', por_curso))
+
+    for ruta in VIEWSETS:
+        resultado.append((f'{ruta}:list', f'/api/{ruta}/', {}))
+    resultado.append(('actividades:list_por_curso', '/api/actividades/', por_curso))
+    for ruta, modelo in (('cursos', Curso), ('estudiantes', Estudiante), ('actividades', Actividad)):
+        pk = modelo.objects.values_list('pk', flat=True).first()
+        if pk is not None:
+            resultado.append((f'{ruta}:retrieve', f'/api/{ruta}/{pk}/', {}))
+    return resultado
+
+
+def capturar_consultas(ruta, params):
+    """SELECT distintos que ejecuta un GET a la ruta (en este hilo y conexión)"""
+    clasificaciones.invalidar()
+    # Sin snapshots ni hilos: todo pasa por la conexión que se está capturando.
+    # Los libros que generen las exportaciones van a un directorio descartable
+    with tempfile.TemporaryDirectory() as temporal, override_settings(
+        ALLOWED_HOSTS=['testserver'], EXPORTACION_SNAPSHOT_MAX_EDAD=0, EXPORTACION_MAX_WORKERS=1,
+        MEDIA_ROOT=temporal, EXPORTACION_GENERADAS_DIR=temporal
+    ), CaptureQueriesContext(connection) as capturadas:
+        respuesta = Client().get(ruta, params)
+        respuesta.close()
+
+    consultas = []
+    for consulta in capturadas.captured_queries:
+        sql = consulta['sql'].strip()
+        if sql.upper().startswith(('SELECT', 'WITH')) and sql not in consultas:
+            consultas.append(sql)
+    return respuesta.status_code, consultas
+
+
+def _explicar_mysql(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN {sql}')
+        columnas = [c[0].lower() for c in cursor.description]
+        filas = [dict(zip(columnas, fila)) for fila in cursor.fetchall()]
+
+    hallazgos = set()
+    for fila in filas:
+        tabla = fila.get('table') or '-'
+        extra = fila.get('extra') or ''
+        if fila.get('type') == 'ALL':
+            hallazgos.add(f'recorrido_completo:{tabla}')
+        if 'Using filesort' in extra:
+            hallazgos.add(f'filesort:{tabla}')
+        if 'Using temporary' in extra:
+            hallazgos.add(f'tabla_temporal:{tabla}')
+    return hallazgos
+
+
+# "SCAN x" (SQLite >= 3.36) o "SCAN TABLE x [AS alias]" (anteriores), sin
+# "USING [COVERING] INDEX"; "SCAN SUBQUERY n" de las versiones viejas no coincide
+_SCAN_SQLITE = re.compile(r'^SCAN (?:TABLE )?(\S+)(?: AS \S+)?$')
+# Tablas derivadas: "CO-ROUTINE x" / "MATERIALIZE x" anteceden al "SCAN x" del resultado
+_DERIVADA_SQLITE = re.compile(r'^(?:CO-ROUTINE|MATERIALIZE) (\S+)$')
+_ALIAS_SQL = re.compile(r'\b(?:FROM|JOIN)\s+"?(\w+)"?\s+(?:AS\s+)?"?(\w+)"?', re.IGNORECASE)
+
+
+def _explicar_sqlite(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        detalles = [fila[-1] for fila in cursor.fetchall()]
+
+    # Desde 3.36 el plan nombra la tabla por su alias ("SCAN d" por "docentes d")
+    alias = {alias: tabla for tabla, alias in _ALIAS_SQL.findall(sql)}
+    derivadas = {d.group(1) for d in map(_DERIVADA_SQLITE.match, detalles) if d}
+
+    hallazgos = set()
+    for detalle in detalles:
+        # Un recorrido sobre el resultado de una subconsulta no es de una tabla:
+        # los recorridos de la subconsulta aparecen en sus propias líneas
+        recorrido = _SCAN_SQLITE.match(detalle)
+        if recorrido and recorrido.group(1) not in derivadas and recorrido.group(1) != 'CONSTANT':
+            hallazgos.add(f'recorrido_completo:{alias.get(recorrido.group(1), recorrido.group(1))}')
+        if 'TEMP B-TREE FOR ORDER BY' in detalle or 'TEMP B-TREE FOR LAST' in detalle:
+            hallazgos.add('filesort')
+        if 'TEMP B-TREE FOR GROUP BY' in detalle or 'TEMP B-TREE FOR DISTINCT' in detalle:
+            hallazgos.add('tabla_temporal')
+    return hallazgos
+
+
+EXPLICADORES = {
+    'mysql': _explicar_mysql,
+    'sqlite': _explicar_sqlite,
+}
+
+
+def revisar():
+    """{escenario: [hallazgos]} para el motor de la conexión por defecto"""
+    explicar = EXPLICADORES.get(connection.vendor)
+    if explicar is None:
+        raise ValueError(f'EXPLAIN no soportado para el motor {connection.vendor}')
+
+    planes = {}
+    for nombre, ruta, params in escenarios():
+        codigo, consultas = capturar_consultas(ruta, params)
+        if codigo >= 400:
+            raise ValueError(f'{nombre}: {ruta} respondió {codigo}')
+        hallazgos = set()
+        for sql in consultas:
+            hallazgos |= explicar(sql)
+        planes[nombre] = sorted(hallazgos)
+    return planes
+
+
+def cargar_base(ruta=RUTA_BASE):
+    """Línea base completa {motor: {escenario: [hallazgos]}}"""
+    ruta = Path(ruta)
+    if not ruta.exists():
+        return {}
+    return json.loads(ruta.read_text(encoding='utf-8'))
+
+
+def guardar_base(planes, ruta=RUTA_BASE):
+    """Reemplaza la línea base del motor actual conservando la de los demás"""
+    base = cargar_base(ruta)
+    base[connection.vendor] = planes
+    Path(ruta).write_text(json.dumps(base, indent=2, sort_keys=True, ensure_ascii=False) + '\n', encoding='utf-8')
+
+
+def comparar(planes, base):
+    """[(escenario, nuevos, resueltos)] solo de los escenarios que cambiaron"""
+    cambios = []
+    for nombre, hallazgos in planes.items():
+        anteriores = set(base.get(nombre, []))
+        nuevos = sorted(set(hallazgos) - anteriores)
+        resueltos = sorted(anteriores - set(hallazgos))
+        if nuevos or resueltos:
+            cambios.append((nombre, nuevos, resueltos))
+    return cambios
@@ -1,6 +1,7 @@
 from rest_framework import serializers
-from .models import Docente, Curso, Estudiante, Actividad
+from .models import Docente, Curso, Estudiante, Actividad, Calificacion, estado_nota
 from django.db.models import Count, Avg
+from decimal import Decimal
 
 class DocenteSerializer(serializers.ModelSerializer):
     class Meta:
@@ -49,6 +50,15 @@ class EstudianteSerializer(serializers.ModelSerializer):
     
     def get_curso_codigo(self, obj):
         return obj.id_curso.codigo if obj.id_curso else None
+    
+    def validate_nota_final(self, value):
+        # Con calificaciones la nota es derivada: un cambio manual se perdería al recalcular
+        if (self.instance is not None and value != self.instance.nota_final
+                and Calificacion.objects.filter(id_estudiante=self.instance).exists()):
+            raise serializers.ValidationError(
+                'La nota final se calcula a partir de las calificaciones del estudiante'
+            )
+        return value
 
 
 class ActividadSerializer(serializers.ModelSerializer):
@@ -63,4 +73,92 @@ class ActividadSerializer(serializers.ModelSerializer):
         return obj.id_curso.nombre if obj.id_curso else None
     
     def get_curso_codigo(self, obj):
-        return obj.id_curso.codigo if obj.id_curso else None
\ No newline at end of file
+        return obj.id_curso.codigo if obj.id_curso else None
+
+
+class CalificacionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Calificacion
+        fields = '__all__'
+    
+    def validate_nota(self, value):
+        if value < 0 or value > 5:
+            raise serializers.ValidationError('La nota debe estar entre 0.0 y 5.0')
+        return value
+    
+    def validate(self, attrs):
+        """La actividad debe ser del curso del estudiante; si no, la nota no contaría"""
+        estudiante = attrs.get('id_estudiante', getattr(self.instance, 'id_estudiante', None))
+        actividad = attrs.get('id_actividad', getattr(self.instance, 'id_actividad', None))
+        if estudiante is not None and actividad is not None and actividad.id_curso_id != estudiante.id_curso_id:
+            raise serializers.ValidationError(
+                {'id_actividad': 'La actividad no pertenece al curso del estudiante'}
+            )
+        return attrs
+
+
+# ==========================================
+# SERIALIZACIÓN RÁPIDA (SOLO LECTURA)
+# ==========================================
+# Los listados construyen la salida directamente desde values_list() con el
+# curso unido en la misma consulta, sin instanciar modelos ni recorrer los
+# campos de DRF. La salida debe ser idéntica a EstudianteSerializer y
+# ActividadSerializer (mismas claves, mismo orden, mismos tipos).
+
+TAMANO_LOTE = 2000
+
+
+def _decimal_a_texto(valor):
+    """Replica DecimalField de DRF (decimal como texto con 1 decimal)"""
+    if valor is None:
+        return None
+    return '{:f}'.format(Decimal(valor).quantize(Decimal('.1')))
+
+
+def iterar_estudiantes(queryset):
+    """Filas de EstudianteSerializer una a una, leyendo la consulta por lotes"""
+    filas = queryset.values_list(
+        'id_estudiante', 'id_curso__nombre', 'id_curso__codigo',
+        'nombre', 'nota_final', 'id_curso'
+    ).iterator(chunk_size=TAMANO_LOTE)
+    for id_estudiante, curso_nombre, curso_codigo, nombre, nota_final, id_curso in filas:
+        yield {
+            'id_estudiante': id_estudiante,
+            'curso_nombre': curso_nombre,
+            'curso_codigo': curso_codigo,
+            'estado': estado_nota(nota_final),
+            'nombre': nombre,
+            'nota_final': _decimal_a_texto(nota_final),
+            'id_curso': id_curso,
+        }
+
+
+def serializar_estudiantes(queryset):
+    """Equivalente rápido de EstudianteSerializer(queryset, many=True).data"""
+    return list(iterar_estudiantes(queryset))
+
+
+def iterar_actividades(queryset):
+    """Filas de ActividadSerializer una a una, leyendo la consulta por lotes"""
+    filas = queryset.values_list(
+        'id_actividad', 'id_curso__nombre', 'id_curso__codigo', 'nombre',
+        'tipo', 'fecha_entrega', 'porcentaje', 'estado', 'id_curso'
+    ).iterator(chunk_size=TAMANO_LOTE)
+    for (id_actividad, curso_nombre, curso_codigo, nombre, tipo,
+         fecha_entrega, porcentaje, estado, id_curso) in filas:
+        yield {
+            'id_actividad': id_actividad,
+            'curso_nombre': curso_nombre,
+            'curso_codigo': curso_codigo,
+            'nombre': nombre,
+            'tipo': tipo,
+            'fecha_entrega': fecha_entrega.isoformat() if fecha_entrega else None,
+            'porcentaje': porcentaje,
+            'estado': estado,
+            'id_curso': id_curso,
+        }
+
+
+def serializar_actividades(queryset):
+    """Equivalente rápido de ActividadSerializer(queryset, many=True).data"""
+    return list(iterar_actividades(queryset))
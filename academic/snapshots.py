@@ -0,0 +1,212 @@
+"""
+Snapshots de exportación pregenerados en MEDIA_ROOT/exportaciones.
+
+`manage.py generar_snapshots` construye un archivo por tipo (y por curso
+activo en los tipos que aceptan id_curso) y lo regenera solo si cambió la
+huella de las tablas de las que depende (COUNT, MAX(pk) y la suma de un
+CRC32 por fila, calculados en la base). /api/exportar/ sirve el archivo
+directamente desde disco mientras no supere EXPORTACION_SNAPSHOT_MAX_EDAD.
+Las escrituras de la API borran con invalidar() los snapshots que dejan de
+reflejar los datos, así que nunca se sirve uno desactualizado por ellas; la
+edad máxima acota el desfase frente a cambios hechos por fuera (admin, SQL).
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import BigIntegerField, CharField, Count, Func, Max, Sum, Value
+from django.db.models.functions import Cast, Coalesce, Concat
+
+from .exportacion import generar_libro, generar_libro_completo
+from .models import Docente, Curso, Estudiante, Actividad
+
+# tipo -> modelos cuyas filas aparecen en la exportación
+DEPENDENCIAS = {
+    'estudiantes': [Estudiante, Curso],
+    'cursos': [Curso, Docente, Estudiante, Actividad],
+    'actividades': [Actividad, Curso],
+    'reporte_completo': [Estudiante, Curso, Actividad],
+    'docentes': [Docente, Curso, Estudiante, Actividad],
+    'libro_completo': [Docente, Curso, Estudiante, Actividad],
+}
+
+# Tipos que filtran por id_curso (modelo filtrado en cada caso)
+TIPOS_POR_CURSO = {
+    'estudiantes': Estudiante,
+    'actividades': Actividad,
+}
+
+MANIFIESTO = 'manifiesto.json'
+
+
+def directorio():
+    return Path(settings.MEDIA_ROOT) / 'exportaciones'
+
+
+def nombre_snapshot(tipo, id_curso=None):
+    """Nombre del archivo; id_curso se normaliza con int() (ValueError si no es entero)"""
+    return f'{tipo}_curso_{int(id_curso)}.xlsx' if id_curso else f'{tipo}.xlsx'
+
+
+def snapshot_vigente(tipo, id_curso=None):
+    """Ruta del snapshot si existe y es reciente; None en otro caso (o si id_curso no es entero)"""
+    max_edad = getattr(settings, 'EXPORTACION_SNAPSHOT_MAX_EDAD', 0)
+    if max_edad <= 0:
+        return None
+    if id_curso and tipo not in TIPOS_POR_CURSO:
+        return None
+    
+    try:
+        ruta = directorio() / nombre_snapshot(tipo, id_curso)
+    except (TypeError, ValueError):
+        return None
+    try:
+        edad = time.time() - ruta.stat().st_mtime
+    except (FileNotFoundError, ValueError):
+        return None
+    return ruta if edad <= max_edad else None
+
+
+def invalidar(ids_curso=()):
+    """Borra los snapshots globales y los de los cursos indicados"""
+    carpeta = directorio()
+    nombres = [nombre_snapshot(tipo) for tipo in DEPENDENCIAS]
+    nombres += [
+        nombre_snapshot(tipo, id_curso)
+        for id_curso in ids_curso if id_curso is not None
+        for tipo in TIPOS_POR_CURSO
+    ]
+    for nombre in nombres:
+        (carpeta / nombre).unlink(missing_ok=True)
+
+
+def invalidar_al_confirmar(*ids_curso):
+    """invalidar() cuando se confirme la transacción en curso (de inmediato fuera de una)"""
+    transaction.on_commit(lambda: invalidar(ids_curso))
+
+
+class _Crc32(Func):
+    function = 'CRC32'
+    output_field = BigIntegerField()
+
+
+def _crc32(texto):
+    return None if texto is None else zlib.crc32(texto.encode())
+
+
+def _preparar_conexion():
+    """MySQL trae CRC32(); en SQLite se registra sobre la conexión"""
+    if connection.vendor == 'sqlite':
+        connection.ensure_connection()
+        connection.connection.create_function('CRC32', 1, _crc32, deterministic=True)
+
+
+def _agregados(modelo):
+    """COUNT, MAX(pk) y SUM(CRC32(pk|col|col...)) de las filas: detecta altas, bajas y ediciones"""
+    partes = []
+    for campo in modelo._meta.concrete_fields:
+        partes += [Coalesce(Cast(campo.attname, CharField()), Value('\\N')), Value('|')]
+    return {
+        'total': Count('pk'),
+        'ultimo': Max('pk'),
+        'suma': Sum(_Crc32(Concat(*partes, output_field=CharField()))),
+    }
+
+
+def _resumen(fila):
+    return f"{fila['total']}:{fila['ultimo']}:{fila['suma']}"
+
+
+def huella(queryset):
+    """Huella de las filas del queryset calculada en la base, sin leerlas"""
+    _preparar_conexion()
+    return _resumen(queryset.aggregate(**_agregados(queryset.model)))
+
+
+def huellas_por_curso(queryset):
+    """{id_curso: huella} de las filas del queryset en una sola consulta agrupada"""
+    _preparar_conexion()
+    return {
+        fila['id_curso']: _resumen(fila)
+        for fila in queryset.order_by().values('id_curso').annotate(**_agregados(queryset.model))
+    }
+
+
+def _guardar(tipo, id_curso, destino):
+    """Escribe el libro en un temporal del mismo directorio y lo reemplaza de forma atómica"""
+    descriptor, temporal = tempfile.mkstemp(dir=destino.parent, suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as archivo:
+            if tipo == 'libro_completo':
+                with generar_libro_completo(id_curso) as libro:
+                    shutil.copyfileobj(libro, archivo)
+            else:
+                generar_libro(tipo, id_curso).save(archivo)
+        os.replace(temporal, destino)
+    except BaseException:
+        os.unlink(temporal)
+        raise
+
+
+def _pendientes():
+    """[(tipo, id_curso, huella)] de todos los snapshots esperados"""
+    huellas_tablas = {}
+    
+    def huella_tablas(modelos):
+        for modelo in modelos:
+            if modelo not in huellas_tablas:
+                huellas_tablas[modelo] = huella(modelo.objects.all())
+        return hashlib.sha1(''.join(huellas_tablas[m] for m in modelos).encode()).hexdigest()
+    
+    snapshots = [(tipo, None, huella_tablas(modelos)) for tipo, modelos in DEPENDENCIAS.items()]
+    
+    # Una consulta por modelo, no por curso
+    cursos = huellas_por_curso(Curso.objects.filter(estado='Activo'))
+    for tipo, modelo in TIPOS_POR_CURSO.items():
+        filas = huellas_por_curso(modelo.objects.filter(id_curso__estado='Activo'))
+        for id_curso, huella_curso in cursos.items():
+            snapshots.append((tipo, id_curso, huella_curso + filas.get(id_curso, '-')))
+    return snapshots
+
+
+def actualizar_snapshots(forzar=False):
+    """
+    Regenera los snapshots cuya huella cambió y borra los de cursos que ya
+    no están activos. Devuelve [(nombre, 'generado' | 'sin cambios')].
+    Los que no cambian se "tocan" para que sigan contando como vigentes.
+    """
+    carpeta = directorio()
+    carpeta.mkdir(parents=True, exist_ok=True)
+    ruta_manifiesto = carpeta / MANIFIESTO
+    
+    try:
+        manifiesto = json.loads(ruta_manifiesto.read_text())
+    except (FileNotFoundError, ValueError):
+        manifiesto = {}
+    
+    resultados = []
+    nuevo_manifiesto = {}
+    for tipo, id_curso, huella_actual in _pendientes():
+        nombre = nombre_snapshot(tipo, id_curso)
+        destino = carpeta / nombre
+        
+        if not forzar and manifiesto.get(nombre) == huella_actual and destino.exists():
+            destino.touch()
+            resultados.append((nombre, 'sin cambios'))
+        else:
+            _guardar(tipo, id_curso, destino)
+            resultados.append((nombre, 'generado'))
+        nuevo_manifiesto[nombre] = huella_actual
+    
+    for nombre in set(manifiesto) - set(nuevo_manifiesto):
+        (carpeta / nombre).unlink(missing_ok=True)
+    
+    ruta_manifiesto.write_text(json.dumps(nuevo_manifiesto, indent=2, sort_keys=True))
+    return resultados
@@ -1,3 +1,980 @@
-from django.test import TestCase
+import importlib.util
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection, models
+from django.db.models import Q
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from . import analitica, exportacion
+from .arranque import MODULOS_DIFERIDOS, medir_arranque
+from .clasificaciones import Clasificacion, clasificaciones
+from .coalescencia import Coalescedor, coalescedor
+from .exportacion import directorio_generadas, generar_excel
+from .memoria import medir_pico, metricas_memoria
+from .models import Docente, Curso, Estudiante, Actividad, Calificacion
+from .notas import calcular_notas, recalcular_curso
+from .planes import _explicar_sqlite, cargar_base, comparar, escenarios, revisar
+from .snapshots import _pendientes, actualizar_snapshots, huella, snapshot_vigente
+from .unidad_trabajo import marcar_curso, recalculador, unidad_de_trabajo
+from .serializers import (
+    EstudianteSerializer, ActividadSerializer,
+    serializar_estudiantes, serializar_actividades
+)
+
+
+class TablasAcademicasMixin:
+    """
+    Los modelos son managed = False, así que la base de pruebas no tiene
+    sus tablas: se crean al inicio de la clase y se eliminan al final.
+    """
+    modelos = [Docente, Curso, Estudiante, Actividad]
+
+    @classmethod
+    def setUpClass(cls):
+        with connection.schema_editor() as editor:
+            for modelo in cls.modelos:
+                editor.create_model(modelo)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.schema_editor() as editor:
+            for modelo in reversed(cls.modelos):
+                editor.delete_model(modelo)
+
+
+class MediaTemporalMixin:
+    """MEDIA_ROOT temporal: snapshots y libros generados no tocan media/ del proyecto"""
+
+    def setUp(self):
+        super().setUp()
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        ajustes = override_settings(
+            MEDIA_ROOT=self.media, EXPORTACION_GENERADAS_DIR=os.path.join(self.media, 'generadas')
+        )
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+
+class DatosAcademicosMixin(TablasAcademicasMixin):
+    @classmethod
+    def setUpTestData(cls):
+        cls.crear_datos()
+
+    @classmethod
+    def crear_datos(cls):
+        cls.docente = Docente.objects.create(nombre='Ana Pérez', correo='ana@correo.com')
+        cls.curso = Curso.objects.create(
+            nombre='Cálculo', codigo='MAT101', estado='Activo', id_docente=cls.docente
+        )
+        cls.otro_curso = Curso.objects.create(nombre='Física', codigo='FIS101', estado='Activo')
+        Estudiante.objects.create(nombre='Luis', id_curso=cls.curso, nota_final=Decimal('4.5'))
+        Estudiante.objects.create(nombre='Marta', id_curso=cls.curso, nota_final=Decimal('2.9'))
+        Estudiante.objects.create(nombre='Sofía', id_curso=cls.otro_curso, nota_final=Decimal('3.0'))
+        Estudiante.objects.create(nombre='Pedro', id_curso=cls.otro_curso)
+        Estudiante.objects.create(nombre='Sin curso')
+        Actividad.objects.create(
+            nombre='Parcial 1', tipo='Examen', fecha_entrega=date(2025, 3, 10),
+            porcentaje=30, estado='Activo', id_curso=cls.curso
+        )
+        Actividad.objects.create(
+            nombre='Taller 1', tipo='Taller', porcentaje=20,
+            estado='Pendiente', id_curso=cls.otro_curso
+        )
+        Actividad.objects.create(nombre='Suelta')
+
+
+class SerializacionRapidaTests(DatosAcademicosMixin, TestCase):
+    def test_estudiantes_igual_que_serializer(self):
+        queryset = Estudiante.objects.order_by('id_estudiante')
+        esperado = [dict(fila) for fila in EstudianteSerializer(queryset, many=True).data]
+        self.assertEqual(serializar_estudiantes(queryset), esperado)
+
+    def test_actividades_igual_que_serializer(self):
+        queryset = Actividad.objects.order_by('id_actividad')
+        esperado = [dict(fila) for fila in ActividadSerializer(queryset, many=True).data]
+        self.assertEqual(serializar_actividades(queryset), esperado)
+
+    def test_orden_de_claves(self):
+        estudiante = Estudiante.objects.first()
+        self.assertEqual(
+            list(serializar_estudiantes(Estudiante.objects.filter(pk=estudiante.pk))[0]),
+            list(EstudianteSerializer(estudiante).data)
+        )
+
+    def test_listado_una_sola_consulta(self):
+        with self.assertNumQueries(1):
+            self.client.get('/api/estudiantes/')
+        with self.assertNumQueries(1):
+            self.client.get('/api/actividades/')
+
+
+class ClasificacionTests(TestCase):
+    def test_orden_y_posiciones(self):
+        ranking = Clasificacion()
+        ranking.agregar(1, Decimal('3.5'))
+        ranking.agregar(2, Decimal('4.8'))
+        ranking.agregar(3, Decimal('3.5'))
+        self.assertEqual(ranking.top(2), [(2, Decimal('4.8')), (1, Decimal('3.5'))])
+        self.assertEqual([ranking.posicion(i) for i in (2, 1, 3)], [1, 2, 3])
+
+        ranking.quitar(2)
+        self.assertEqual(ranking.posicion(1), 1)
+        self.assertEqual(ranking.posicion(3), 2)
+        self.assertIsNone(ranking.posicion(2))
+
+    def test_carga_en_bloque(self):
+        pares = [(1, Decimal('3.5')), (2, Decimal('4.8')), (3, Decimal('3.5'))]
+        incremental, en_bloque = Clasificacion(), Clasificacion()
+        for id_estudiante, nota in pares:
+            incremental.agregar(id_estudiante, nota)
+        en_bloque.cargar(pares)
+        self.assertEqual(en_bloque.top(3), incremental.top(3))
+        self.assertEqual([en_bloque.posicion(i) for i in (1, 2, 3)], [2, 1, 3])
+
+    def test_actualizacion_no_recorre_el_ranking(self):
+        # Escala "grande" de generar_datos; reubicar una nota no debe ser O(n) en Python
+        n = 1_000_000
+        ranking = Clasificacion()
+        ranking.cargar((i, Decimal(i % 50) / 10) for i in range(n))
+
+        inicio = time.perf_counter()
+        for i in range(0, n, n // 100):
+            ranking.quitar(i)
+            ranking.agregar(i, Decimal('4.9'))
+        por_actualizacion = (time.perf_counter() - inicio) / 100
+
+        self.assertLess(por_actualizacion, 0.01)
+        self.assertEqual(ranking.posicion(0), 1)
+        self.assertEqual(len(ranking), n)
+
+
+@override_settings(RECALCULO_DEMORA=0)
+class TopEstudiantesTests(DatosAcademicosMixin, TestCase):
+    def setUp(self):
+        clasificaciones.invalidar()
+
+    def test_top_global_y_por_curso(self):
+        respuesta = self.client.get('/api/reportes/', {'action': 'top_estudiantes', 'n': 2})
+        self.assertEqual(
+            [(f['estudiante'], f['curso'], f['promedio']) for f in respuesta.json()],
+            [('Luis', 'Cálculo', 4.5), ('Sofía', 'Física', 3.0)]
+        )
+
+        respuesta = self.client.get(
+            '/api/reportes/', {'action': 'top_estudiantes', 'id_curso': self.curso.id_curso}
+        )
+        self.assertEqual([f['estudiante'] for f in respuesta.json()], ['Luis', 'Marta'])
+
+    def test_escrituras_actualizan_ranking(self):
+        marta = Estudiante.objects.get(nombre='Marta')
+        self.client.get('/api/reportes/', {'action': 'top_estudiantes'})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                f'/api/estudiantes/{marta.pk}/', {'nota_final': '4.9'}, content_type='application/json'
+            )
+        respuesta = self.client.get(
+            '/api/reportes/', {'action': 'posicion_estudiante', 'id_estudiante': marta.pk}
+        )
+        self.assertEqual(respuesta.json()['posicion_global'], 1)
+        self.assertEqual(respuesta.json()['posicion_curso'], 1)
+        self.assertEqual(respuesta.json()['total_curso'], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/estudiantes/{marta.pk}/')
+        respuesta = self.client.get(
+            '/api/reportes/', {'action': 'posicion_estudiante', 'id_estudiante': marta.pk}
+        )
+        self.assertEqual(respuesta.status_code, 404)
+
+    def test_recarga_por_edad(self):
+        self.client.get('/api/reportes/', {'action': 'top_estudiantes'})
+        # Escritura hecha por fuera de este proceso (otro worker, SQL directo)
+        Estudiante.objects.filter(nombre='Marta').update(nota_final=Decimal('5.0'))
+
+        with override_settings(CLASIFICACIONES_MAX_EDAD=3600):
+            respuesta = self.client.get('/api/reportes/', {'action': 'top_estudiantes', 'n': 1})
+            self.assertEqual(respuesta.json()[0]['estudiante'], 'Luis')
+        with override_settings(CLASIFICACIONES_MAX_EDAD=0.001):
+            time.sleep(0.01)
+            respuesta = self.client.get('/api/reportes/', {'action': 'top_estudiantes', 'n': 1})
+            self.assertEqual(respuesta.json()[0]['estudiante'], 'Marta')
+
+
+class NotasPonderadasTests(DatosAcademicosMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.taller = Actividad.objects.create(
+            nombre='Taller 2', tipo='Taller', porcentaje=70, estado='Activo', id_curso=cls.curso
+        )
+        cls.parcial = Actividad.objects.get(nombre='Parcial 1')
+        cls.luis = Estudiante.objects.get(nombre='Luis')
+        cls.marta = Estudiante.objects.get(nombre='Marta')
+        Calificacion.objects.create(id_estudiante=cls.luis, id_actividad=cls.parcial, nota=Decimal('4.0'))
+        Calificacion.objects.create(id_estudiante=cls.luis, id_actividad=cls.taller, nota=Decimal('3.0'))
+        Calificacion.objects.create(id_estudiante=cls.marta, id_actividad=cls.parcial, nota=Decimal('5.0'))
+
+    def setUp(self):
+        clasificaciones.invalidar()
+
+    def test_calculo_ponderado(self):
+        # Luis: 4.0 * 0.3 + 3.0 * 0.7 = 3.3 ; Marta: 5.0 * 0.3 + 0 * 0.7 = 1.5
+        self.assertEqual(
+            calcular_notas(self.curso.id_curso),
+            {self.luis.pk: Decimal('3.3'), self.marta.pk: Decimal('1.5')}
+        )
+
+    def test_recalcular_curso_escribe_en_bloque(self):
+        self.assertEqual(recalcular_curso(self.curso.id_curso), 2)
+        self.luis.refresh_from_db()
+        self.assertEqual(self.luis.nota_final, Decimal('3.3'))
+        self.assertEqual(recalcular_curso(self.curso.id_curso), 0)
+
+    def test_cambio_de_calificacion_recalcula_estudiante(self):
+        respuesta = self.client.post('/api/calificaciones/', {
+            'id_estudiante': self.marta.pk, 'id_actividad': self.taller.pk, 'nota': '4.0'
+        }, content_type='application/json')
+        self.assertEqual(respuesta.status_code, 201)
+        self.marta.refresh_from_db()
+        self.assertEqual(self.marta.nota_final, Decimal('4.3'))
+        # Luis conserva su nota manual porque no se tocó ninguna de sus calificaciones
+        self.luis.refresh_from_db()
+        self.assertEqual(self.luis.nota_final, Decimal('4.5'))
+
+    def test_borrar_ultima_calificacion(self):
+        self.client.post('/api/calificaciones/', {
+            'id_estudiante': self.marta.pk, 'id_actividad': self.taller.pk, 'nota': '4.0'
+        }, content_type='application/json')
+        for calificacion in Calificacion.objects.filter(id_estudiante=self.marta):
+            self.client.delete(f'/api/calificaciones/{calificacion.pk}/')
+        self.marta.refresh_from_db()
+        self.assertIsNone(self.marta.nota_final)
+
+    def test_recalcular_id_curso_invalido(self):
+        for datos in ({}, {'id_curso': 'abc'}):
+            respuesta = self.client.post('/api/notas/recalcular/', datos, content_type='application/json')
+            self.assertEqual(respuesta.status_code, 400)
+
+        respuesta = self.client.post(
+            '/api/notas/recalcular/', {'id_curso': str(self.curso.pk)}, content_type='application/json'
+        )
+        self.assertEqual(respuesta.json()['actualizados'], 2)
+
+    def test_nota_fuera_de_rango(self):
+        respuesta = self.client.post('/api/calificaciones/', {
+            'id_estudiante': self.marta.pk, 'id_actividad': self.taller.pk, 'nota': '5.5'
+        }, content_type='application/json')
+        self.assertEqual(respuesta.status_code, 400)
+
+    def test_actividad_de_otro_curso(self):
+        otra = Actividad.objects.get(nombre='Taller 1')
+        respuesta = self.client.post('/api/calificaciones/', {
+            'id_estudiante': self.marta.pk, 'id_actividad': otra.pk, 'nota': '4.0'
+        }, content_type='application/json')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn('id_actividad', respuesta.json())
+
+    @override_settings(RECALCULO_DEMORA=0)
+    def test_borrar_actividad_borra_sus_calificaciones(self):
+        recalcular_curso(self.curso.id_curso)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/actividades/{self.parcial.pk}/')
+        recalculador.vaciar()
+
+        self.assertFalse(Calificacion.objects.filter(id_actividad=self.parcial.pk).exists())
+        # Marta solo tenía el parcial; Luis queda con el taller (3.0 * 0.7 / 0.7)
+        self.marta.refresh_from_db()
+        self.assertIsNone(self.marta.nota_final)
+        self.luis.refresh_from_db()
+        self.assertEqual(self.luis.nota_final, Decimal('3.0'))
+
+    def test_curso_sin_actividades_con_porcentaje(self):
+        recalcular_curso(self.curso.id_curso)
+        Actividad.objects.filter(id_curso=self.curso).update(porcentaje=0)
+        self.assertEqual(recalcular_curso(self.curso.id_curso), 2)
+        self.assertEqual(
+            list(Estudiante.objects.filter(pk__in=[self.luis.pk, self.marta.pk]).values_list('nota_final', flat=True)),
+            [None, None]
+        )
+
+    def test_borrar_estudiante_borra_sus_calificaciones(self):
+        self.client.delete(f'/api/estudiantes/{self.marta.pk}/')
+        self.assertFalse(Calificacion.objects.filter(id_estudiante=self.marta.pk).exists())
+
+
+class UnidadDeTrabajoTests(DatosAcademicosMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.parcial = Actividad.objects.get(nombre='Parcial 1')
+        cls.luis = Estudiante.objects.get(nombre='Luis')
+        Calificacion.objects.create(id_estudiante=cls.luis, id_actividad=cls.parcial, nota=Decimal('4.0'))
+
+    def tearDown(self):
+        recalculador.vaciar()
+
+    @override_settings(RECALCULO_DEMORA=0)
+    def test_recalculo_tras_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            respuesta = self.client.post('/api/actividades/', {
+                'nombre': 'Taller 2', 'porcentaje': 70, 'id_curso': self.curso.id_curso
+            }, content_type='application/json')
+            self.assertEqual(respuesta.status_code, 201)
+        self.luis.refresh_from_db()
+        self.assertEqual(self.luis.nota_final, Decimal('4.5'))
+
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+        # 4.0 * 0.3 + 0 * 0.7
+        self.luis.refresh_from_db()
+        self.assertEqual(self.luis.nota_final, Decimal('1.2'))
+
+    @override_settings(RECALCULO_DEMORA=0)
+    def test_lote_en_una_transaccion(self):
+        lote = [
+            {'nombre': 'Quiz 1', 'porcentaje': 10, 'id_curso': self.curso.id_curso},
+            {'nombre': 'Quiz 2', 'porcentaje': 10, 'id_curso': self.otro_curso.id_curso},
+        ]
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            respuesta = self.client.post('/api/actividades/', lote, content_type='application/json')
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual([a['nombre'] for a in respuesta.json()], ['Quiz 1', 'Quiz 2'])
+        self.assertEqual(len(callbacks), 1)
+
+        lote = [{'nombre': 'Quiz 3', 'porcentaje': 10}, {'nombre': 'Quiz 4', 'porcentaje': 'mucho'}]
+        respuesta = self.client.post('/api/actividades/', lote, content_type='application/json')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertFalse(Actividad.objects.filter(nombre='Quiz 3').exists())
+
+    @override_settings(RECALCULO_DEMORA=60)
+    def test_rafaga_se_agrupa(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                f'/api/actividades/{self.parcial.pk}/', {'porcentaje': 50}, content_type='application/json'
+            )
+            self.client.patch(
+                f'/api/actividades/{self.parcial.pk}/', {'porcentaje': 40}, content_type='application/json'
+            )
+        self.assertEqual(recalculador.pendientes(), {self.curso.id_curso})
+
+        self.assertEqual(recalculador.vaciar(), 1)
+        self.assertEqual(recalculador.pendientes(), set())
+        self.luis.refresh_from_db()
+        self.assertEqual(self.luis.nota_final, Decimal('4.0'))
+
+    @override_settings(RECALCULO_DEMORA=60)
+    def test_solo_recalcula_si_cambian_las_entradas(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                f'/api/estudiantes/{self.luis.pk}/', {'nombre': 'Luis A.'}, content_type='application/json'
+            )
+            self.client.patch(
+                f'/api/actividades/{self.parcial.pk}/', {'nombre': 'Parcial'}, content_type='application/json'
+            )
+        self.assertEqual(recalculador.pendientes(), set())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                f'/api/estudiantes/{self.luis.pk}/', {'id_curso': self.otro_curso.pk}, content_type='application/json'
+            )
+        self.assertEqual(recalculador.pendientes(), {self.curso.pk, self.otro_curso.pk})
+
+    def test_nota_final_derivada_no_se_edita(self):
+        respuesta = self.client.patch(
+            f'/api/estudiantes/{self.luis.pk}/', {'nota_final': '5.0'}, content_type='application/json'
+        )
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn('nota_final', respuesta.json())
+
+        # Sin calificaciones la nota sigue siendo manual
+        marta = Estudiante.objects.get(nombre='Marta')
+        respuesta = self.client.patch(
+            f'/api/estudiantes/{marta.pk}/', {'nota_final': '5.0'}, content_type='application/json'
+        )
+        self.assertEqual(respuesta.status_code, 200)
+
+    def test_rollback_no_recalcula(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            with self.assertRaises(ValueError):
+                with unidad_de_trabajo():
+                    marcar_curso(self.curso.id_curso)
+                    raise ValueError
+        self.assertEqual(callbacks, [])
+
+
+@override_settings(EXPORTACION_SNAPSHOT_MAX_EDAD=0)
+class ExportacionTests(MediaTemporalMixin, DatosAcademicosMixin, TestCase):
+    def test_hoja_estudiantes(self):
+        respuesta = self.client.get('/api/exportar/', {'tipo': 'estudiantes', 'id_curso': self.curso.id_curso})
+        ws = load_workbook(BytesIO(respuesta.getvalue())).active
+        self.assertEqual(ws.title, 'Estudiantes')
+        self.assertEqual(ws.cell(row=2, column=2).value, 'Luis')
+        self.assertEqual(ws.cell(row=7, column=2).value, 2)  # Total de registros
+
+    def test_tipo_invalido(self):
+        respuesta = self.client.get('/api/exportar/', {'tipo': 'otro'})
+        self.assertEqual(respuesta.status_code, 400)
+
+    def test_exportacion_grande_write_only(self):
+        normal = self.client.get('/api/exportar/', {'tipo': 'actividades'})
+        with self.settings(EXPORTACION_FILAS_STREAMING=1):
+            respuesta = self.client.get('/api/exportar/', {'tipo': 'actividades'})
+        self.assertTrue(respuesta.streaming)
+
+        hojas = [
+            load_workbook(BytesIO(contenido)).active
+            for contenido in (normal.getvalue(), respuesta.getvalue())
+        ]
+        # Iguales salvo la fecha de generación del pie
+        filas = [[f for f in ws.iter_rows(values_only=True) if f[0] != 'Reporte generado:'] for ws in hojas]
+        self.assertEqual(filas[0], filas[1])
+        self.assertEqual(hojas[1].title, 'Actividades')
+
+    def test_libro_generado_se_borra_al_enviarse(self):
+        respuesta = self.client.get('/api/exportar/', {'tipo': 'cursos'})
+        self.assertEqual(load_workbook(BytesIO(respuesta.getvalue())).active.title, 'Cursos')
+        self.assertEqual(list(directorio_generadas().iterdir()), [])
+
+    def test_exportacion_grande_coalescida(self):
+        with self.settings(EXPORTACION_FILAS_STREAMING=1), \
+                mock.patch('academic.views.coalescedor.ejecutar', wraps=coalescedor.ejecutar) as ejecutar:
+            self.client.get('/api/exportar/', {'tipo': 'actividades'})
+        self.assertEqual(ejecutar.call_args.args[0], ('exportar', 'actividades', None, True))
+
+    def test_anchos_desde_muestra(self):
+        with mock.patch('academic.exportacion.MUESTRA_ANCHOS', 1):
+            ws = load_workbook(generar_excel('actividades', write_only=True)).active
+        # Solo la primera fila ('Parcial 1') cuenta para el ancho de Nombre
+        self.assertEqual(ws.column_dimensions['B'].width, len('Parcial 1') + 2)
+
+    def test_libro_compartido_por_ruta(self):
+        ruta = generar_excel('estudiantes')
+        self.assertEqual(ruta.parent, directorio_generadas())
+        self.assertEqual(load_workbook(ruta).active.title, 'Estudiantes')
+
+        # Los vencidos se borran al generar otro
+        antiguo = time.time() - 3600
+        os.utime(ruta, (antiguo, antiguo))
+        nuevo = generar_excel('cursos')
+        self.assertFalse(ruta.exists())
+        self.assertTrue(nuevo.exists())
+
+    def test_exportacion_excede_maximo(self):
+        with self.settings(EXPORTACION_FILAS_MAXIMAS=2):
+            respuesta = self.client.get('/api/exportar/', {'tipo': 'estudiantes'})
+            self.assertEqual(respuesta.status_code, 400)
+            self.assertIn('filtre por id_curso', respuesta.json()['error'])
+
+            respuesta = self.client.get('/api/exportar/', {'tipo': 'estudiantes', 'id_curso': self.curso.id_curso})
+            self.assertEqual(respuesta.status_code, 200)
+
+
+class MemoriaTests(DatosAcademicosMixin, TestCase):
+    def setUp(self):
+        metricas_memoria.reiniciar()
+
+    def tearDown(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def test_medir_pico(self):
+        _, pico = medir_pico(lambda: bytearray(2 * 2**20))
+        self.assertGreaterEqual(pico, 2 * 2**20)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_metricas_por_vista(self):
+        respuesta = self.client.get('/api/estudiantes/')
+        self.assertNotIn('X-Memoria-Pico-KB', respuesta)
+
+        with self.settings(MEMORIA_PERFILAR=True):
+            respuesta = self.client.get('/api/estudiantes/')
+            self.assertIn('X-Memoria-Pico-KB', respuesta)
+            self.client.get('/api/estudiantes/')
+            metricas = self.client.get('/api/metricas/').json()
+
+        self.assertTrue(metricas['perfilado_memoria'])
+        self.assertEqual(metricas['memoria']['estudiante-list']['peticiones'], 2)
+        self.assertGreater(metricas['memoria']['estudiante-list']['pico_maximo_kb'], 0)
+
+    def test_listado_grande_por_partes(self):
+        normal = self.client.get('/api/actividades/').json()
+        # Una sola consulta: las filas vistas para decidir se envían seguidas del resto
+        with self.settings(LISTADO_FILAS_STREAMING=1), self.assertNumQueries(1):
+            respuesta = self.client.get('/api/actividades/')
+            contenido = b''.join(respuesta.streaming_content)
+        self.assertTrue(respuesta.streaming)
+        self.assertEqual(json.loads(contenido), normal)
+
+        with self.settings(LISTADO_FILAS_STREAMING=len(normal)):
+            self.assertFalse(self.client.get('/api/actividades/').streaming)
+
+
+@override_settings(EXPORTACION_SNAPSHOT_MAX_EDAD=0)
+class LibroCompletoTests(MediaTemporalMixin, DatosAcademicosMixin, TransactionTestCase):
+    """Transaccional para que los hilos del pool vean los datos de prueba"""
+
+    def setUp(self):
+        super().setUp()
+        self.crear_datos()
+
+    def tearDown(self):
+        # El flush de TransactionTestCase no vacía las tablas managed = False
+        for modelo in reversed(self.modelos):
+            modelo.objects.all().delete()
+
+    def test_una_hoja_por_tipo_mas_resumen(self):
+        respuesta = self.client.get('/api/exportar/', {'tipo': 'libro_completo'})
+        wb = load_workbook(BytesIO(respuesta.getvalue()))
+        self.assertEqual(
+            wb.sheetnames,
+            ['Resumen', 'Estudiantes', 'Cursos', 'Actividades', 'Reporte Completo', 'Docentes']
+        )
+        resumen = {fila[0]: fila[1] for fila in wb['Resumen'].iter_rows(min_row=2, max_row=6, values_only=True)}
+        self.assertEqual(
+            resumen,
+            {'Estudiantes': 5, 'Cursos': 2, 'Actividades': 3, 'Reporte Completo': 4, 'Docentes': 1}
+        )
+
+    def test_libro_completo_write_only(self):
+        hilos = set()
+        volcar = exportacion._volcar_filas
+
+        def volcar_registrando(tipo, id_curso):
+            hilos.add(threading.get_ident())
+            return volcar(tipo, id_curso)
+
+        with mock.patch('academic.exportacion._volcar_filas', volcar_registrando):
+            en_disco = load_workbook(generar_excel('libro_completo', write_only=True))
+        en_memoria = load_workbook(generar_excel('libro_completo'))
+
+        # Las hojas se siguen generando en el pool, no en el hilo de la petición
+        self.assertNotIn(threading.get_ident(), hilos)
+        self.assertEqual(en_disco.sheetnames, en_memoria.sheetnames)
+        for hoja in en_disco.sheetnames[1:]:
+            self.assertEqual(
+                list(en_disco[hoja].iter_rows(values_only=True)), list(en_memoria[hoja].iter_rows(values_only=True))
+            )
+        self.assertEqual(en_disco['Resumen'].cell(row=2, column=2).value, 5)
+
+
+@override_settings(EXPORTACION_MAX_WORKERS=1, EXPORTACION_SNAPSHOT_MAX_EDAD=900)
+class SnapshotsTests(MediaTemporalMixin, DatosAcademicosMixin, TestCase):
+    def test_solo_regenera_lo_que_cambio(self):
+        primera = dict(actualizar_snapshots())
+        self.assertTrue(all(estado == 'generado' for estado in primera.values()))
+        self.assertIn(f'estudiantes_curso_{self.curso.id_curso}.xlsx', primera)
+
+        Actividad.objects.filter(nombre='Taller 1').update(porcentaje=25)
+        segunda = dict(actualizar_snapshots())
+        self.assertEqual(segunda['estudiantes.xlsx'], 'sin cambios')
+        self.assertEqual(segunda[f'actividades_curso_{self.curso.id_curso}.xlsx'], 'sin cambios')
+        self.assertEqual(segunda[f'actividades_curso_{self.otro_curso.id_curso}.xlsx'], 'generado')
+        self.assertEqual(segunda['actividades.xlsx'], 'generado')
+
+    def test_huella_detecta_ediciones_de_igual_largo(self):
+        antes = huella(Estudiante.objects.all())
+        Estudiante.objects.filter(nombre='Marta').update(nombre='Marte')
+        self.assertNotEqual(huella(Estudiante.objects.all()), antes)
+
+        # Intercambiar valores entre filas también cambia la huella (el pk entra en cada CRC)
+        antes = huella(Estudiante.objects.all())
+        luis, marte = Estudiante.objects.get(nombre='Luis'), Estudiante.objects.get(nombre='Marte')
+        Estudiante.objects.filter(pk=luis.pk).update(nombre='Marte')
+        Estudiante.objects.filter(pk=marte.pk).update(nombre='Luis')
+        self.assertNotEqual(huella(Estudiante.objects.all()), antes)
+
+    def test_huellas_sin_consultas_por_curso(self):
+        with CaptureQueriesContext(connection) as antes:
+            _pendientes()
+        for i in range(5):
+            Curso.objects.create(nombre=f'Curso {i}', codigo=f'X{i}', estado='Activo', id_docente=self.docente)
+        with CaptureQueriesContext(connection) as despues:
+            pendientes = _pendientes()
+        self.assertEqual(len(despues), len(antes))
+        self.assertEqual(len([p for p in pendientes if p[1] is not None]), 2 * 7)
+
+    def test_id_curso_invalido_no_arma_rutas(self):
+        actualizar_snapshots()
+        self.assertIsNotNone(snapshot_vigente('estudiantes', str(self.curso.id_curso)))
+        self.assertEqual(
+            snapshot_vigente('estudiantes', f'0{self.curso.id_curso}'),
+            snapshot_vigente('estudiantes', self.curso.id_curso)
+        )
+        for id_curso in ('../../manifiesto', '1/../x', 'abc'):
+            self.assertIsNone(snapshot_vigente('estudiantes', id_curso))
+
+    def test_exportar_sirve_snapshot_vigente(self):
+        self.assertIsNone(snapshot_vigente('cursos'))
+        actualizar_snapshots()
+        ruta = snapshot_vigente('cursos')
+
+        respuesta = self.client.get('/api/exportar/', {'tipo': 'cursos'})
+        self.assertEqual(b''.join(respuesta.streaming_content), ruta.read_bytes())
+
+    def test_escritura_invalida_snapshots(self):
+        actualizar_snapshots()
+        marta = Estudiante.objects.get(nombre='Marta')
+        with self.captureOnCommitCallbacks(execute=True), self.settings(RECALCULO_DEMORA=0):
+            self.client.patch(f'/api/estudiantes/{marta.pk}/', {'nombre': 'Marta R.'}, content_type='application/json')
+
+        self.assertIsNone(snapshot_vigente('estudiantes'))
+        self.assertIsNone(snapshot_vigente('estudiantes', self.curso.id_curso))
+        self.assertIsNotNone(snapshot_vigente('estudiantes', self.otro_curso.id_curso))
+
+        respuesta = self.client.get('/api/exportar/', {'tipo': 'estudiantes'})
+        nombres = [fila[1] for fila in load_workbook(BytesIO(respuesta.getvalue())).active.iter_rows(values_only=True)]
+        self.assertIn('Marta R.', nombres)
+
+
+class AdminListadosTests(DatosAcademicosMixin, TestCase):
+    # sesión + usuario + conteo + página (con join) + curso del filtro
+    # + 2 de date_hierarchy en actividades
+    PRESUPUESTO_CONSULTAS = 7
+
+    def setUp(self):
+        admin = User.objects.create_superuser('admin', 'admin@correo.com', 'clave')
+        self.client.force_login(admin)
+
+    def test_presupuesto_de_consultas(self):
+        for url in ['/admin/academic/estudiante/', '/admin/academic/actividad/']:
+            for parametros in [{}, {'id_curso': self.curso.id_curso}]:
+                with self.subTest(url=url, parametros=parametros):
+                    with CaptureQueriesContext(connection) as consultas:
+                        respuesta = self.client.get(url, parametros)
+                    self.assertEqual(respuesta.status_code, 200)
+                    self.assertLessEqual(len(consultas), self.PRESUPUESTO_CONSULTAS)
+
+    def test_busqueda_y_filtro(self):
+        respuesta = self.client.get('/admin/academic/estudiante/', {'q': 'Lu'})
+        self.assertEqual([e.nombre for e in respuesta.context['cl'].result_list], ['Luis'])
+
+        respuesta = self.client.get('/admin/academic/estudiante/', {'id_curso': self.otro_curso.id_curso})
+        self.assertEqual(respuesta.context['cl'].result_count, 2)
+        self.assertContains(respuesta, 'admin-autocomplete')
+
+    def test_autocompletado_de_cursos(self):
+        respuesta = self.client.get('/admin/autocomplete/', {
+            'app_label': 'academic', 'model_name': 'estudiante', 'field_name': 'id_curso', 'term': 'Cál'
+        })
+        self.assertEqual([r['text'] for r in respuesta.json()['results']], ['Cálculo (MAT101)'])
+
+    def test_filtro_invalido(self):
+        respuesta = self.client.get('/admin/academic/estudiante/', {'id_curso': 'x'})
+        self.assertRedirects(respuesta, '/admin/academic/estudiante/?e=1', fetch_redirect_response=False)
+
+
+class CoalescenciaTests(TestCase):
+    def _simultaneas(self, coalescedores, clave='reporte'):
+        """Lanza una llamada por coalescedor a la vez; devuelve (resultados, ejecuciones)"""
+        ejecuciones = []
+        resultados = []
+        barrera = threading.Barrier(len(coalescedores))
+
+        def calcular():
+            ejecuciones.append(1)
+            time.sleep(0.2)
+            return {'total': 42}
+
+        def peticion(coalescedor):
+            barrera.wait()
+            resultados.append(coalescedor.ejecutar(clave, calcular))
+
+        hilos = [threading.Thread(target=peticion, args=(c,)) for c in coalescedores]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        return resultados, len(ejecuciones)
+
+    def test_mismo_proceso_un_solo_calculo(self):
+        coalescedor = Coalescedor()
+        resultados, ejecuciones = self._simultaneas([coalescedor] * 5)
+        self.assertEqual(ejecuciones, 1)
+        self.assertEqual(resultados, [{'total': 42}] * 5)
+
+    @override_settings(COALESCENCIA_CACHE='default')
+    def test_entre_procesos_con_cache_compartido(self):
+        # Cada Coalescedor hace de un proceso distinto; solo comparten el cache
+        resultados, ejecuciones = self._simultaneas([Coalescedor() for _ in range(3)], 'otro')
+        self.assertEqual(ejecuciones, 1)
+        self.assertEqual(resultados, [{'total': 42}] * 3)
+
+    def test_liberar_tras_el_ultimo_participante(self):
+        coalescedor = Coalescedor()
+        barrera = threading.Barrier(4)
+        usados, liberados = [], []
+
+        def calcular():
+            time.sleep(0.2)
+            return 'libro.xlsx'
+
+        def usar(resultado):
+            self.assertEqual(liberados, [])
+            usados.append(resultado)
+            return resultado
+
+        def peticion():
+            barrera.wait()
+            coalescedor.ejecutar('exportar', calcular, usar=usar, liberar=liberados.append)
+
+        hilos = [threading.Thread(target=peticion) for _ in range(4)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        self.assertEqual(len(usados), 4)
+        self.assertEqual(liberados, ['libro.xlsx'])
+
+    def test_errores_se_propagan_y_no_quedan_en_curso(self):
+        coalescedor = Coalescedor()
+        with self.assertRaises(ZeroDivisionError):
+            coalescedor.ejecutar('falla', lambda: 1 / 0)
+        self.assertEqual(coalescedor.ejecutar('falla', lambda: 'ok'), 'ok')
+
+
+class GenerarDatosTests(TablasAcademicasMixin, TestCase):
+    def _generar(self, semilla):
+        call_command(
+            'generar_datos', '--limpiar', '--calificaciones', '--estudiantes', '30',
+            '--semilla', str(semilla), stdout=StringIO()
+        )
+        return (
+            list(Curso.objects.order_by('pk').values_list()),
+            list(Estudiante.objects.order_by('pk').values_list()),
+            list(Actividad.objects.order_by('pk').values_list()),
+        )
+
+    def test_misma_semilla_mismos_datos(self):
+        primera = self._generar(7)
+        self.assertEqual(self._generar(7), primera)
+        self.assertNotEqual(self._generar(8), primera)
+        self.assertEqual(Estudiante.objects.count(), 30)
+
+    def test_porcentajes_suman_cien(self):
+        self._generar(7)
+        sumas = Actividad.objects.values('id_curso').annotate(total=models.Sum('porcentaje'))
+        self.assertEqual({s['total'] for s in sumas}, {100})
+
+    def test_rechaza_base_remota(self):
+        with mock.patch.object(connection, 'vendor', 'mysql'):
+            with self.assertRaisesMessage(CommandError, '--permitir-remota'):
+                call_command('generar_datos', '--limpiar', stdout=StringIO())
+
+    def test_prueba_carga_rechaza_base_remota(self):
+        with mock.patch.object(connection, 'vendor', 'mysql'):
+            with self.assertRaisesMessage(CommandError, '--permitir-remota'):
+                call_command('prueba_carga', '--escrituras', '--duracion', '0', stdout=StringIO())
+
+
+@skipUnless(importlib.util.find_spec('duckdb'), 'duckdb no está instalado')
+class AnaliticaTests(DatosAcademicosMixin, TestCase):
+    def setUp(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio)
+        ajustes = override_settings(ANALITICA_DIR=directorio)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+    def test_historial_conserva_notas_reemplazadas(self):
+        self.assertEqual(analitica.tendencia(), [])
+        analitica.tomar_snapshot(periodo='2025-1')
+        Estudiante.objects.filter(nombre='Marta').update(nota_final=Decimal('3.8'))
+        analitica.tomar_snapshot(periodo='2025-2')
+
+        marta = Estudiante.objects.get(nombre='Marta')
+        historial = analitica.historial_estudiante(marta.pk)
+        self.assertEqual([(h['periodo'], h['nota_final']) for h in historial], [('2025-1', 2.9), ('2025-2', 3.8)])
+
+    def test_ignora_snapshots_sin_publicar(self):
+        analitica.tomar_snapshot(periodo='2025-1')
+        publicado = analitica.directorio() / analitica.snapshots()[0]
+        # Copia a medio escribir (o abandonada) con un snapshot_id posterior
+        Estudiante.objects.filter(nombre='Marta').update(nota_final=Decimal('3.8'))
+        analitica.tomar_snapshot(periodo='2025-1')
+        ultimo = analitica.directorio() / analitica.snapshots()[-1]
+        oculto = analitica.directorio() / '.tmp-abandonado'
+        oculto.mkdir()
+        shutil.copy(ultimo / 'estudiantes.parquet', oculto)
+        shutil.rmtree(ultimo)
+
+        self.assertEqual(analitica.snapshots(), [publicado.name])
+        marta = Estudiante.objects.get(nombre='Marta')
+        self.assertEqual([h['nota_final'] for h in analitica.historial_estudiante(marta.pk)], [2.9])
+        self.assertEqual(len(analitica.tendencia()), 1)
+        self.assertFalse(any(analitica.directorio_temporal().iterdir()))
+
+    def test_reportes_por_periodo_y_docente(self):
+        analitica.tomar_snapshot(periodo='2025-1')
+
+        respuesta = self.client.get('/api/analitica/', {'action': 'por_periodo', 'id_curso': self.curso.id_curso})
+        self.assertEqual(respuesta.json(), [{
+            'periodo': '2025-1', 'id_curso': self.curso.id_curso, 'curso': 'Cálculo', 'codigo': 'MAT101',
+            'estudiantes': 2, 'promedio': 3.7, 'tasa_aprobacion': 50.0,
+        }])
+
+        respuesta = self.client.get('/api/analitica/', {'action': 'por_docente', 'periodo': '2025-1'})
+        docente = respuesta.json()[0]
+        self.assertEqual((docente['docente'], docente['cursos'], docente['estudiantes']), ('Ana Pérez', 1, 2))
+
+
+class ReporteDocentesTests(MediaTemporalMixin, DatosAcademicosMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.sin_cursos = Docente.objects.create(nombre='Beatriz Rojas')
+        Curso.objects.create(nombre='Álgebra', codigo='MAT102', estado='Activo', id_docente=cls.docente)
+        Actividad.objects.create(nombre='Quiz 1', tipo='Quiz', porcentaje=10, id_curso=cls.curso)
+
+    def test_una_sola_consulta(self):
+        with self.assertNumQueries(1):
+            respuesta = self.client.get('/api/reportes/', {'action': 'docentes'})
+
+        ana, beatriz = respuesta.json()
+        self.assertEqual(ana['cursos'], ['Cálculo', 'Álgebra'])
+        self.assertEqual(ana['num_cursos'], 2)
+        # Cálculo: Luis 4.5 y Marta 2.9, sin multiplicarse por sus 2 actividades
+        self.assertEqual(ana['total_estudiantes'], 2)
+        self.assertEqual(ana['promedio'], 3.7)
+        self.assertEqual(ana['tasa_aprobacion'], 50.0)
+        self.assertEqual(ana['total_actividades'], 2)
+        self.assertEqual(ana['actividades_por_tipo']['Examen'], 1)
+        self.assertEqual(ana['actividades_por_tipo']['Quiz'], 1)
+        self.assertEqual(
+            (beatriz['num_cursos'], beatriz['total_estudiantes'], beatriz['promedio']), (0, 0, None)
+        )
+
+    @override_settings(EXPORTACION_SNAPSHOT_MAX_EDAD=0)
+    def test_exportar_docentes(self):
+        respuesta = self.client.get('/api/exportar/', {'tipo': 'docentes'})
+        ws = load_workbook(BytesIO(respuesta.getvalue())).active
+        self.assertEqual(ws.title, 'Docentes')
+        self.assertEqual(ws.cell(row=2, column=2).value, 'Ana Pérez')
+
+
+class CalendarioTests(DatosAcademicosMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.hoy = timezone.localdate()
+        Actividad.objects.create(
+            nombre='Atrasada', tipo='Tarea', fecha_entrega=cls.hoy - timedelta(days=3),
+            estado='Pendiente', id_curso=cls.curso
+        )
+        Actividad.objects.create(
+            nombre='Esta semana', tipo='Quiz', fecha_entrega=cls.hoy + timedelta(days=2),
+            estado='Activo', id_curso=cls.curso
+        )
+        Actividad.objects.create(
+            nombre='Fin de mes', tipo='Trabajo', fecha_entrega=cls.hoy + timedelta(days=20),
+            estado='Activo', id_curso=cls.otro_curso
+        )
+
+    def test_ventana_por_defecto(self):
+        respuesta = self.client.get('/api/calendario/').json()
+        self.assertEqual(
+            [(a['nombre'], a['situacion']) for a in respuesta['actividades']],
+            [('Atrasada', 'vencida'), ('Esta semana', 'proxima'), ('Fin de mes', 'programada')]
+        )
+        self.assertEqual(respuesta['resumen'], {'vencida': 1, 'pasada': 0, 'proxima': 1, 'programada': 1})
+
+    def test_vencidas_fuera_de_ventana_y_pasadas(self):
+        Actividad.objects.create(
+            nombre='Muy atrasada', fecha_entrega=self.hoy - timedelta(days=60),
+            estado='Pendiente', id_curso=self.curso
+        )
+        Actividad.objects.create(
+            nombre='Entregada', fecha_entrega=self.hoy - timedelta(days=1),
+            estado='Activo', id_curso=self.curso
+        )
+        respuesta = self.client.get('/api/calendario/').json()
+        self.assertEqual(
+            [(a['nombre'], a['situacion']) for a in respuesta['actividades']][:3],
+            [('Muy atrasada', 'vencida'), ('Atrasada', 'vencida'), ('Entregada', 'pasada')]
+        )
+        self.assertEqual(respuesta['resumen']['vencida'], 2)
+        self.assertEqual(respuesta['resumen']['pasada'], 1)
+
+    def test_por_curso_y_ventana(self):
+        respuesta = self.client.get('/api/calendario/', {
+            'id_curso': self.curso.id_curso, 'desde': self.hoy.isoformat()
+        }).json()
+        # La pendiente vencida aparece aunque la ventana empiece hoy
+        self.assertEqual([a['nombre'] for a in respuesta['actividades']], ['Atrasada', 'Esta semana'])
+
+        respuesta = self.client.get('/api/calendario/', {'desde': 'ayer'})
+        self.assertEqual(respuesta.status_code, 400)
+
+    def test_pendientes_igual_que_con_or(self):
+        esperado = Actividad.objects.filter(
+            Q(estado='Pendiente') | Q(fecha_entrega__gt=timezone.now().date())
+        ).values('id_curso__nombre').annotate(pendientes=models.Count('id_actividad'))
+        esperado = {a['id_curso__nombre'] or 'Sin curso': a['pendientes'] for a in esperado}
+
+        respuesta = self.client.get('/api/reportes/', {'action': 'actividades_pendientes'}).json()
+        self.assertEqual({r['curso']: r['pendientes'] for r in respuesta}, esperado)
+        self.assertEqual(esperado, {'Cálculo': 2, 'Física': 2})
+
+
+class PlanesConsultaTests(MediaTemporalMixin, DatosAcademicosMixin, TestCase):
+    def test_revisa_todos_los_escenarios(self):
+        planes = revisar()
+        self.assertEqual(set(planes), {nombre for nombre, _, _ in escenarios()})
+        self.assertIn('reportes:docentes', planes)
+        self.assertIn('estudiantes:retrieve', planes)
+        # La línea base versionada cubre los mismos escenarios
+        self.assertEqual(set(cargar_base()['sqlite']), set(planes))
+        # Las exportaciones revisadas no dejan libros en media/
+        self.assertEqual(list(Path(self.media).rglob('*.xlsx')), [])
+
+    def test_detecta_regresiones(self):
+        planes = {'estudiantes:list': ['recorrido_completo:estudiantes'], 'cursos:list': []}
+        base = {'estudiantes:list': [], 'cursos:list': ['filesort']}
+        self.assertEqual(comparar(planes, base), [
+            ('estudiantes:list', ['recorrido_completo:estudiantes'], []),
+            ('cursos:list', [], ['filesort']),
+        ])
+        self.assertEqual(comparar(base, base), [])
+
+    def test_alias_y_subconsultas_sqlite(self):
+        # El alias se resuelve a la tabla; el recorrido del resultado de la subconsulta no cuenta
+        self.assertEqual(_explicar_sqlite('SELECT * FROM docentes d'), {'recorrido_completo:docentes'})
+        hallazgos = _explicar_sqlite('SELECT * FROM (SELECT id_curso, COUNT(*) FROM estudiantes GROUP BY id_curso) u')
+        self.assertIn('recorrido_completo:estudiantes', hallazgos)
+        self.assertNotIn('recorrido_completo:u', hallazgos)
+
+    def test_formato_anterior_sqlite(self):
+        detalles = ['SCAN TABLE docentes AS d', 'SCAN SUBQUERY 1 AS e', 'SCAN TABLE cursos USING INDEX idx']
+        with mock.patch('academic.planes.connection') as conexion:
+            conexion.cursor.return_value.__enter__.return_value.fetchall.return_value = [(0, 0, 0, d) for d in detalles]
+            self.assertEqual(_explicar_sqlite('SELECT 1'), {'recorrido_completo:docentes'})
+
+
+class ArranqueTests(TestCase):
+    # Margen amplio: la medición real ronda 0.3 s; solo detecta regresiones gruesas
+    PRESUPUESTO_SEGUNDOS = 2.0
+
+    def test_arranque_sin_dependencias_pesadas(self):
+        resultado = medir_arranque()
+        self.assertEqual([m for m in MODULOS_DIFERIDOS if m in resultado['modulos']], [])
+        self.assertLess(resultado['segundos'], self.PRESUPUESTO_SEGUNDOS)
+        self.assertIn('django', resultado['por_paquete'])
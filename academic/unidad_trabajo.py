@@ -0,0 +1,121 @@
+"""
+Unidad de trabajo para las escrituras de la API.
+
+Cada petición de escritura (o lote) corre en una sola transacción y va
+anotando los id_curso que toca, y cuáles de ellos cambiaron las entradas de
+las notas (curso de un estudiante, porcentajes de actividades). Al
+confirmarse la transacción se descartan los snapshots de exportación de
+los cursos tocados y se programa un único recálculo diferido de las notas
+finales ponderadas (y rankings) de los que lo necesitan; las ráfagas de
+escrituras que llegan dentro de RECALCULO_DEMORA se agrupan en una sola
+pasada por curso, fuera del camino de la petición. Si la transacción se
+revierte no se recalcula nada.
+"""
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from .clasificaciones import clasificaciones
+from .notas import recalcular_curso
+from .snapshots import invalidar as invalidar_snapshots
+
+_local = threading.local()
+
+
+@contextmanager
+def unidad_de_trabajo():
+    """Transacción que registra los cursos tocados; las anidadas se suman a la exterior"""
+    if getattr(_local, 'cursos', None) is not None:
+        with transaction.atomic():
+            yield
+        return
+
+    _local.cursos = cursos = set()
+    _local.por_recalcular = por_recalcular = set()
+    try:
+        with transaction.atomic():
+            yield
+            if cursos:
+                transaction.on_commit(lambda: _despachar(cursos, por_recalcular))
+    finally:
+        _local.cursos = _local.por_recalcular = None
+
+
+def marcar_curso(*ids_curso, recalcular=True):
+    """
+    Anota cursos tocados por la escritura en curso (None = sin curso: solo
+    afecta a lo global). recalcular=False cuando no cambian las notas del
+    curso, p. ej. al renombrar un estudiante.
+    """
+    ids_curso = set(ids_curso)
+    por_recalcular = {id_curso for id_curso in ids_curso if id_curso is not None} if recalcular else set()
+    cursos = getattr(_local, 'cursos', None)
+    if cursos is None:
+        # Fuera de una unidad de trabajo: tras el commit actual
+        transaction.on_commit(lambda: _despachar(ids_curso, por_recalcular))
+    else:
+        cursos.update(ids_curso)
+        _local.por_recalcular.update(por_recalcular)
+
+
+def _despachar(cursos, por_recalcular):
+    """Tras el commit: los snapshots se descartan ya y las notas se recalculan diferidas"""
+    invalidar_snapshots(cursos)
+    if por_recalcular:
+        recalculador.programar(por_recalcular)
+
+
+class Recalculador:
+    """Agrupa los cursos pendientes y los recalcula en un hilo tras una breve demora"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ejecucion = threading.Lock()
+        self._pendientes = set()
+        self._temporizador = None
+
+    def programar(self, cursos):
+        demora = getattr(settings, 'RECALCULO_DEMORA', 0.5)
+        if demora <= 0:
+            self.recalcular(cursos)
+            return
+        with self._lock:
+            self._pendientes.update(cursos)
+            if self._temporizador is None:
+                self._temporizador = threading.Timer(demora, self._vaciar_en_hilo)
+                self._temporizador.daemon = True
+                self._temporizador.start()
+
+    def pendientes(self):
+        with self._lock:
+            return set(self._pendientes)
+
+    def vaciar(self):
+        """Recalcula ya lo pendiente (p. ej. en pruebas o al apagar el proceso)"""
+        with self._lock:
+            if self._temporizador is not None:
+                self._temporizador.cancel()
+                self._temporizador = None
+            cursos, self._pendientes = self._pendientes, set()
+        return self.recalcular(cursos)
+
+    def recalcular(self, cursos):
+        """Recalcula las notas de cada curso; devuelve cuántos estudiantes cambiaron"""
+        with self._ejecucion:
+            cambios = sum(recalcular_curso(id_curso) for id_curso in sorted(cursos))
+        if cambios:
+            clasificaciones.invalidar()
+            invalidar_snapshots(cursos)
+        return cambios
+
+    def _vaciar_en_hilo(self):
+        """Corre en el hilo del temporizador; cierra su conexión propia al terminar"""
+        try:
+            self.vaciar()
+        finally:
+            connections.close_all()
+
+
+recalculador = Recalculador()
@@ -7,6 +7,7 @@ router = DefaultRouter()
 router.register(r'cursos', views.CursoViewSet, basename='curso')
 router.register(r'estudiantes', views.EstudianteViewSet, basename='estudiante')
 router.register(r'actividades', views.ActividadViewSet, basename='actividad')
+router.register(r'calificaciones', views.CalificacionViewSet, basename='calificacion')
 
 urlpatterns = [
     # API REST Framework
@@ -15,4 +16,8 @@ urlpatterns = [
     # Endpoints personalizados
     path('api/reportes/', views.reportes, name='reportes'),
     path('api/exportar/', views.exportar_excel, name='exportar'),
+    path('api/analitica/', views.analitica, name='analitica'),
+    path('api/calendario/', views.calendario, name='calendario'),
+    path('api/metricas/', views.metricas, name='metricas'),
+    path('api/notas/recalcular/', views.recalcular_notas, name='recalcular_notas'),
 ]
\ No newline at end of file
@@ -1,17 +1,33 @@
+import json
+from itertools import chain, islice
+
+from django.conf import settings
 from django.shortcuts import render
-from django.http import HttpResponse
-from django.db.models import Count, Avg, Q
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.db import transaction
+from django.db.models import Count, Avg
 from rest_framework import viewsets, status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from .models import Docente, Curso, Estudiante, Actividad
+from .models import Docente, Curso, Estudiante, Actividad, Calificacion
 from .serializers import (
     DocenteSerializer, CursoSerializer, 
-    EstudianteSerializer, ActividadSerializer
+    EstudianteSerializer, ActividadSerializer, CalificacionSerializer,
+    iterar_estudiantes, iterar_actividades
 )
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill
-from datetime import datetime
+from .clasificaciones import clasificaciones
+from .notas import limpiar_notas, recalcular_curso, recalcular_estudiante
+from .exportacion import HOJAS, contar_filas, generar_excel, liberar_generado
+from .snapshots import snapshot_vigente, invalidar_al_confirmar
+from .coalescencia import coalescedor
+from .memoria import metricas_memoria
+from .unidad_trabajo import unidad_de_trabajo, marcar_curso
+from .consultas import estadisticas_docentes, actividades_pendientes_por_curso
+from . import analitica as almacen_analitico
+from datetime import datetime, date, timedelta
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
 
 # ==========================================
 # PÁGINA PRINCIPAL
@@ -25,6 +41,66 @@ def index(request):
 # API VIEWSETS (CRUD AUTOMÁTICO)
 # ==========================================
 
+def _listado(queryset, iterar):
+    """
+    Listado sin paginar: hasta LISTADO_FILAS_STREAMING filas se responde
+    normal; por encima el JSON se envía por partes sin armar la lista
+    completa ni el cuerpo entero en memoria (misma salida).
+    """
+    limite = getattr(settings, 'LISTADO_FILAS_STREAMING', 10000)
+    filas = iterar(queryset)
+    if not limite:
+        return Response(list(filas))
+    
+    # Una sola consulta: se miran las primeras limite + 1 filas y, si hay más,
+    # se envían seguidas del resto del mismo iterador
+    primeras = list(islice(filas, limite + 1))
+    if len(primeras) <= limite:
+        return Response(primeras)
+    return StreamingHttpResponse(_json_por_partes(chain(primeras, filas)), content_type='application/json')
+
+
+def _json_por_partes(filas, por_parte=500):
+    """Arreglo JSON compacto (como el JSONRenderer de DRF) en trozos de por_parte filas"""
+    yield '['
+    separador, parte = '', []
+    for fila in filas:
+        parte.append(json.dumps(fila, ensure_ascii=False, separators=(',', ':'), allow_nan=False))
+        if len(parte) == por_parte:
+            yield separador + ','.join(parte)
+            separador, parte = ',', []
+    if parte:
+        yield separador + ','.join(parte)
+    yield ']'
+
+
+class UnidadDeTrabajoMixin:
+    """
+    Cada escritura corre en una unidad de trabajo (una transacción); los
+    perform_* anotan con marcar_curso() los cursos afectados y el recálculo
+    de sus datos derivados se hace una sola vez, diferido, tras el commit.
+    POST con una lista crea todos los elementos en la misma transacción.
+    """
+    
+    def create(self, request, *args, **kwargs):
+        with unidad_de_trabajo():
+            if not isinstance(request.data, list):
+                return super().create(request, *args, **kwargs)
+            
+            serializer = self.get_serializer(data=request.data, many=True)
+            serializer.is_valid(raise_exception=True)
+            self.perform_create(serializer)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+    
+    def update(self, request, *args, **kwargs):
+        with unidad_de_trabajo():
+            return super().update(request, *args, **kwargs)
+    
+    def destroy(self, request, *args, **kwargs):
+        with unidad_de_trabajo():
+            return super().destroy(request, *args, **kwargs)
+
+
 class CursoViewSet(viewsets.ModelViewSet):
     """
     API para CRUD completo de Cursos
@@ -42,13 +118,55 @@ class CursoViewSet(viewsets.ModelViewSet):
         queryset = self.get_queryset()
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
+    
+    def perform_create(self, serializer):
+        serializer.save()
+        invalidar_al_confirmar()
+    
+    def perform_update(self, serializer):
+        curso = serializer.save()
+        invalidar_al_confirmar(curso.id_curso)
+    
+    def perform_destroy(self, instance):
+        id_curso = instance.id_curso
+        instance.delete()
+        invalidar_al_confirmar(id_curso)
 
 
-class EstudianteViewSet(viewsets.ModelViewSet):
+class EstudianteViewSet(UnidadDeTrabajoMixin, viewsets.ModelViewSet):
     """API para CRUD completo de Estudiantes"""
     queryset = Estudiante.objects.all()
     serializer_class = EstudianteSerializer
     
+    def list(self, request):
+        """Listado de solo lectura por la ruta rápida (misma salida que el serializer)"""
+        return _listado(self.get_queryset(), iterar_estudiantes)
+    
+    def perform_create(self, serializer):
+        # Un estudiante nuevo aún no tiene calificaciones: no cambia las notas del curso
+        creados = serializer.save()
+        for estudiante in creados if isinstance(creados, list) else [creados]:
+            marcar_curso(estudiante.id_curso_id, recalcular=False)
+            transaction.on_commit(lambda e=estudiante: clasificaciones.actualizar(e))
+    
+    def perform_update(self, serializer):
+        curso_anterior = serializer.instance.id_curso_id
+        estudiante = serializer.save()
+        if estudiante.id_curso_id != curso_anterior:
+            marcar_curso(curso_anterior, estudiante.id_curso_id)
+        else:
+            marcar_curso(estudiante.id_curso_id, recalcular=False)
+        transaction.on_commit(lambda: clasificaciones.actualizar(estudiante))
+    
+    def perform_destroy(self, instance):
+        id_estudiante = instance.id_estudiante
+        id_curso = instance.id_curso_id
+        # Las FK de Calificacion no tienen restricción ni cascada en la base
+        Calificacion.objects.filter(id_estudiante=id_estudiante).delete()
+        instance.delete()
+        marcar_curso(id_curso, recalcular=False)
+        transaction.on_commit(lambda: clasificaciones.eliminar(id_estudiante))
+    
     def retrieve(self, request, pk=None):
         """Obtener un estudiante específico"""
         try:
@@ -62,7 +180,7 @@ class EstudianteViewSet(viewsets.ModelViewSet):
             )
 
 
-class ActividadViewSet(viewsets.ModelViewSet):
+class ActividadViewSet(UnidadDeTrabajoMixin, viewsets.ModelViewSet):
     """API para CRUD completo de Actividades"""
     queryset = Actividad.objects.all()
     serializer_class = ActividadSerializer
@@ -77,6 +195,37 @@ class ActividadViewSet(viewsets.ModelViewSet):
         
         return queryset.order_by('-fecha_entrega')
     
+    def list(self, request):
+        """Listado de solo lectura por la ruta rápida (misma salida que el serializer)"""
+        return _listado(self.get_queryset(), iterar_actividades)
+    
+    def perform_create(self, serializer):
+        # Solo las actividades con porcentaje entran en la nota ponderada
+        creadas = serializer.save()
+        for actividad in creadas if isinstance(creadas, list) else [creadas]:
+            marcar_curso(actividad.id_curso_id, recalcular=bool(actividad.porcentaje))
+    
+    def perform_update(self, serializer):
+        anterior = (serializer.instance.id_curso_id, serializer.instance.porcentaje)
+        actividad = serializer.save()
+        marcar_curso(
+            anterior[0], actividad.id_curso_id,
+            recalcular=anterior != (actividad.id_curso_id, actividad.porcentaje)
+        )
+    
+    def perform_destroy(self, instance):
+        id_curso = instance.id_curso_id
+        recalcular = bool(instance.porcentaje)
+        # Las FK de Calificacion no tienen restricción ni cascada en la base
+        calificaciones = Calificacion.objects.filter(id_actividad=instance.id_actividad)
+        calificados = list(calificaciones.values_list('id_estudiante', flat=True))
+        calificaciones.delete()
+        instance.delete()
+        # Quien solo tenía nota en esta actividad no entra en el recálculo del curso
+        if limpiar_notas(calificados):
+            transaction.on_commit(clasificaciones.invalidar)
+        marcar_curso(id_curso, recalcular=recalcular)
+    
     def retrieve(self, request, pk=None):
         """Obtener una actividad específica"""
         try:
@@ -90,6 +239,70 @@ class ActividadViewSet(viewsets.ModelViewSet):
             )
 
 
+class CalificacionViewSet(viewsets.ModelViewSet):
+    """
+    API para CRUD de Calificaciones (nota de un estudiante en una actividad).
+    Cada cambio recalcula la nota final ponderada de ese estudiante.
+    """
+    queryset = Calificacion.objects.all()
+    serializer_class = CalificacionSerializer
+    
+    def get_queryset(self):
+        """Permite filtrar con ?id_estudiante=1 o ?id_actividad=1"""
+        queryset = Calificacion.objects.all()
+        id_estudiante = self.request.query_params.get('id_estudiante', None)
+        id_actividad = self.request.query_params.get('id_actividad', None)
+        
+        if id_estudiante:
+            queryset = queryset.filter(id_estudiante=id_estudiante)
+        if id_actividad:
+            queryset = queryset.filter(id_actividad=id_actividad)
+        
+        return queryset
+    
+    def perform_create(self, serializer):
+        calificacion = serializer.save()
+        self._recalcular(calificacion.id_estudiante_id)
+    
+    def perform_update(self, serializer):
+        calificacion = serializer.save()
+        self._recalcular(calificacion.id_estudiante_id)
+    
+    def perform_destroy(self, instance):
+        id_estudiante = instance.id_estudiante_id
+        instance.delete()
+        self._recalcular(id_estudiante)
+    
+    def _recalcular(self, id_estudiante):
+        try:
+            estudiante = recalcular_estudiante(id_estudiante)
+        except Estudiante.DoesNotExist:
+            return
+        clasificaciones.actualizar(estudiante)
+        invalidar_al_confirmar(estudiante.id_curso_id)
+
+
+@api_view(['POST'])
+def recalcular_notas(request):
+    """
+    Recalcula la nota final ponderada de todos los estudiantes de un curso
+    POST /api/notas/recalcular/  {"id_curso": 1}
+    """
+    try:
+        id_curso = int(request.data.get('id_curso'))
+    except (TypeError, ValueError):
+        return Response(
+            {'success': False, 'error': 'Parámetro id_curso requerido (entero)'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    actualizados = recalcular_curso(id_curso)
+    if actualizados:
+        clasificaciones.invalidar()
+        invalidar_al_confirmar(id_curso)
+    return Response({'success': True, 'id_curso': id_curso, 'actualizados': actualizados})
+
+
 # ==========================================
 # API REPORTES
 # ==========================================
@@ -103,11 +316,28 @@ def reportes(request):
     GET /api/reportes/?action=estudiantes_por_curso
     GET /api/reportes/?action=rendimiento
     GET /api/reportes/?action=actividades_pendientes
-    GET /api/reportes/?action=top_estudiantes
+    GET /api/reportes/?action=top_estudiantes&n=10&id_curso=1
+    GET /api/reportes/?action=posicion_estudiante&id_estudiante=1
     GET /api/reportes/?action=promedios_mensuales
+    GET /api/reportes/?action=docentes
     """
     action = request.GET.get('action', 'general')
     
+    # Peticiones simultáneas con los mismos parámetros comparten un solo cálculo
+    clave = ('reportes',) + tuple(sorted((k, tuple(v)) for k, v in request.GET.lists()))
+    data, codigo = coalescedor.ejecutar(
+        clave, lambda: _datos_respuesta(_reporte(action, request.GET))
+    )
+    return Response(data, status=codigo)
+
+
+def _datos_respuesta(response):
+    """(data, status) de una Response, compartible entre peticiones"""
+    return response.data, response.status_code
+
+
+def _reporte(action, params):
+    """Calcula la acción de /api/reportes/ y devuelve su Response"""
     try:
         if action == 'general':
             # Estadísticas generales del sistema
@@ -193,43 +423,51 @@ def reportes(request):
         
         elif action == 'actividades_pendientes':
             # Actividades pendientes por curso
-            from django.utils import timezone
-            
-            actividades_pendientes = Actividad.objects.filter(
-                Q(estado='Pendiente') | Q(fecha_entrega__gt=timezone.now().date())
-            ).values('id_curso__nombre').annotate(
-                pendientes=Count('id_actividad')
-            ).order_by('-pendientes')
+            actividades_pendientes = actividades_pendientes_por_curso(timezone.now().date())
             
             resultados = [
                 {
-                    'curso': a['id_curso__nombre'] or 'Sin curso', 
-                    'pendientes': a['pendientes']
+                    'curso': nombre or 'Sin curso', 
+                    'pendientes': pendientes
                 } 
-                for a in actividades_pendientes
+                for nombre, pendientes in actividades_pendientes
             ]
             return Response(resultados)
         
         elif action == 'top_estudiantes':
-            # Top 10 mejores estudiantes
-            top_estudiantes = Estudiante.objects.filter(
-                nota_final__isnull=False
-            ).select_related('id_curso').order_by('-nota_final')[:10]
+            # Top N mejores estudiantes (global o por curso) desde el ranking precalculado
+            try:
+                n = int(params.get('n', 10))
+                id_curso = params.get('id_curso')
+                id_curso = int(id_curso) if id_curso else None
+            except ValueError:
+                return Response(
+                    {'success': False, 'error': 'Parámetros n e id_curso deben ser enteros'}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             
-            resultados = [
-                {
-                    'estudiante': e.nombre,
-                    'curso': e.id_curso.nombre if e.id_curso else 'Sin curso',
-                    'promedio': float(e.nota_final)
-                }
-                for e in top_estudiantes
-            ]
-            return Response(resultados)
+            return Response(clasificaciones.top(max(n, 0), id_curso=id_curso))
+        
+        elif action == 'posicion_estudiante':
+            # Posición de un estudiante en su curso y en el ranking global
+            try:
+                id_estudiante = int(params.get('id_estudiante', ''))
+            except ValueError:
+                return Response(
+                    {'success': False, 'error': 'Parámetro id_estudiante requerido'}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            posicion = clasificaciones.posicion(id_estudiante)
+            if posicion is None:
+                return Response(
+                    {'error': 'Estudiante no encontrado o sin calificar'}, 
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            return Response(posicion)
         
         elif action == 'promedios_mensuales':
             # Promedios mensuales (simulado)
-            from django.db.models.functions import TruncMonth
-            
             # Agrupar actividades por mes
             actividades_por_mes = Actividad.objects.filter(
                 fecha_entrega__isnull=False
@@ -260,12 +498,150 @@ def reportes(request):
             resultados.sort(key=lambda x: x['mes'])
             return Response(resultados)
         
+        elif action == 'docentes':
+            # Carga y rendimiento por docente (una sola consulta agrupada)
+            return Response(estadisticas_docentes())
+        
+        else:
+            return Response(
+                {'success': False, 'error': 'Acción no válida'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    
+    except Exception as e:
+        return Response(
+            {'success': False, 'error': str(e)}, 
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+# ==========================================
+# CALENDARIO DE ACTIVIDADES
+# ==========================================
+
+@api_view(['GET'])
+def calendario(request):
+    """
+    Actividades con entrega en una ventana de fechas, global o por curso
+    GET /api/calendario/?desde=2025-03-01&hasta=2025-03-31
+    GET /api/calendario/?id_curso=1&dias_proximas=7
+    Por defecto la ventana va de 7 días atrás a 30 días adelante; las
+    pendientes ya vencidas se incluyen siempre, aunque queden antes de la
+    ventana. Cada actividad trae su situación: vencida (pendiente con fecha
+    pasada), pasada (fecha pasada y no pendiente), proxima (entrega en los
+    próximos dias_proximas días) o programada.
+    """
+    hoy = timezone.localdate()
+    try:
+        desde = date.fromisoformat(request.GET['desde']) if request.GET.get('desde') else hoy - timedelta(days=7)
+        hasta = date.fromisoformat(request.GET['hasta']) if request.GET.get('hasta') else hoy + timedelta(days=30)
+        dias_proximas = int(request.GET.get('dias_proximas', 7))
+        id_curso = int(request.GET['id_curso']) if request.GET.get('id_curso') else None
+    except ValueError:
+        return Response(
+            {'success': False, 'error': 'Fechas en formato AAAA-MM-DD; id_curso y dias_proximas enteros'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    # Dos ramas disjuntas unidas con UNION ALL, cada una sobre su índice:
+    # la ventana por actividades_calendario_idx (fecha_entrega, estado, id_curso)
+    # y las pendientes vencidas anteriores por actividades_estado_idx (estado, fecha_entrega, id_curso)
+    ventana = Actividad.objects.filter(fecha_entrega__range=(desde, hasta))
+    vencidas = Actividad.objects.filter(estado='Pendiente', fecha_entrega__lt=min(desde, hoy))
+    if id_curso:
+        ventana = ventana.filter(id_curso=id_curso)
+        vencidas = vencidas.filter(id_curso=id_curso)
+    
+    campos = (
+        'id_actividad', 'nombre', 'tipo', 'fecha_entrega', 'porcentaje', 'estado',
+        'id_curso', 'id_curso__nombre'
+    )
+    actividades = ventana.values(*campos).union(vencidas.values(*campos), all=True)
+    
+    limite_proximas = hoy + timedelta(days=dias_proximas)
+    resultados = []
+    resumen = {'vencida': 0, 'pasada': 0, 'proxima': 0, 'programada': 0}
+    for fila in actividades.order_by('fecha_entrega', 'id_actividad'):
+        fecha = fila['fecha_entrega']
+        if fecha < hoy:
+            situacion = 'vencida' if fila['estado'] == 'Pendiente' else 'pasada'
+        elif fecha <= limite_proximas:
+            situacion = 'proxima'
+        else:
+            situacion = 'programada'
+        resumen[situacion] += 1
+        
+        resultados.append({
+            'id_actividad': fila['id_actividad'],
+            'nombre': fila['nombre'],
+            'tipo': fila['tipo'],
+            'fecha_entrega': fecha.isoformat(),
+            'porcentaje': fila['porcentaje'],
+            'estado': fila['estado'],
+            'id_curso': fila['id_curso'],
+            'curso': fila['id_curso__nombre'] or 'Sin curso',
+            'situacion': situacion,
+        })
+    
+    return Response({
+        'desde': desde.isoformat(),
+        'hasta': hasta.isoformat(),
+        'hoy': hoy.isoformat(),
+        'resumen': resumen,
+        'actividades': resultados,
+    })
+
+
+# ==========================================
+# API ANALÍTICA (HISTÓRICO)
+# ==========================================
+
+@api_view(['GET'])
+def analitica(request):
+    """
+    Reportes históricos desde el almacén analítico (no consulta la base OLTP)
+    GET /api/analitica/?action=snapshots
+    GET /api/analitica/?action=tendencia&id_curso=1
+    GET /api/analitica/?action=por_periodo&id_curso=1
+    GET /api/analitica/?action=por_docente&periodo=2025-1
+    GET /api/analitica/?action=historial_estudiante&id_estudiante=1
+    """
+    action = request.GET.get('action', 'tendencia')
+    
+    try:
+        if action == 'snapshots':
+            return Response(almacen_analitico.snapshots())
+        
+        elif action == 'tendencia':
+            return Response(almacen_analitico.tendencia(request.GET.get('id_curso')))
+        
+        elif action == 'por_periodo':
+            return Response(almacen_analitico.por_periodo(request.GET.get('id_curso')))
+        
+        elif action == 'por_docente':
+            return Response(almacen_analitico.por_docente(request.GET.get('periodo')))
+        
+        elif action == 'historial_estudiante':
+            id_estudiante = request.GET.get('id_estudiante')
+            if not id_estudiante:
+                return Response(
+                    {'success': False, 'error': 'Parámetro id_estudiante requerido'}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            return Response(almacen_analitico.historial_estudiante(id_estudiante))
+        
         else:
             return Response(
                 {'success': False, 'error': 'Acción no válida'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
     
+    except ValueError:
+        return Response(
+            {'success': False, 'error': 'Los parámetros id_curso e id_estudiante deben ser enteros'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
     except Exception as e:
         return Response(
             {'success': False, 'error': str(e)}, 
@@ -273,6 +649,22 @@ def reportes(request):
         )
 
 
+# ==========================================
+# MÉTRICAS
+# ==========================================
+
+@api_view(['GET'])
+def metricas(request):
+    """
+    Pico de memoria por vista medido por MemoriaMiddleware
+    GET /api/metricas/
+    """
+    return Response({
+        'perfilado_memoria': getattr(settings, 'MEMORIA_PERFILAR', False),
+        'memoria': metricas_memoria.resumen(),
+    })
+
+
 # ==========================================
 # EXPORTACIÓN A EXCEL
 # ==========================================
@@ -285,169 +677,68 @@ def exportar_excel(request):
     GET /api/exportar/?tipo=cursos
     GET /api/exportar/?tipo=actividades
     GET /api/exportar/?tipo=reporte_completo
+    GET /api/exportar/?tipo=docentes
+    GET /api/exportar/?tipo=libro_completo   (todas las hojas + resumen)
     GET /api/exportar/?tipo=estudiantes&id_curso=1
     """
     tipo = request.GET.get('tipo', 'estudiantes')
     id_curso = request.GET.get('id_curso', None)
+    nombre_archivo = f'reporte_{tipo}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
     
-    # Crear libro de Excel
-    wb = Workbook()
-    ws = wb.active
-    
-    # Estilos para encabezados
-    header_font = Font(bold=True, color="FFFFFF", size=12)
-    header_fill = PatternFill(start_color="1a5276", end_color="1a5276", fill_type="solid")
-    header_alignment = Alignment(horizontal="center", vertical="center")
+    if tipo != 'libro_completo' and tipo not in HOJAS:
+        return Response(
+            {'success': False, 'error': 'Tipo de exportación no válido'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
     
     try:
-        if tipo == 'estudiantes':
-            ws.title = "Estudiantes"
-            headers = ['ID', 'Nombre Completo', 'Curso', 'Código Curso', 'Nota Final', 'Estado']
-            ws.append(headers)
-            
-            # Aplicar estilos
-            for cell in ws[1]:
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-            
-            # Obtener datos
-            estudiantes = Estudiante.objects.select_related('id_curso')
-            if id_curso:
-                estudiantes = estudiantes.filter(id_curso=id_curso)
-            
-            for e in estudiantes:
-                ws.append([
-                    e.id_estudiante,
-                    e.nombre or '',
-                    e.id_curso.nombre if e.id_curso else 'Sin curso',
-                    e.id_curso.codigo if e.id_curso else '-',
-                    float(e.nota_final) if e.nota_final else '-',
-                    e.estado
-                ])
-        
-        elif tipo == 'cursos':
-            ws.title = "Cursos"
-            headers = ['ID', 'Nombre', 'Código', 'Descripción', 'Estado', 
-                      'Docente', 'Total Estudiantes', 'Total Actividades', 'Promedio']
-            ws.append(headers)
-            
-            for cell in ws[1]:
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-            
-            cursos = Curso.objects.select_related('id_docente')
-            
-            for c in cursos:
-                num_estudiantes = Estudiante.objects.filter(id_curso=c).count()
-                num_actividades = Actividad.objects.filter(id_curso=c).count()
-                
-                estudiantes_con_nota = Estudiante.objects.filter(id_curso=c, nota_final__isnull=False)
-                if estudiantes_con_nota.exists():
-                    promedio = estudiantes_con_nota.aggregate(Avg('nota_final'))['nota_final__avg']
-                    promedio = round(float(promedio), 2) if promedio else '-'
-                else:
-                    promedio = '-'
-                
-                ws.append([
-                    c.id_curso,
-                    c.nombre or '',
-                    c.codigo or '',
-                    c.descripcion or '',
-                    c.estado or '',
-                    c.id_docente.nombre if c.id_docente else 'Sin docente',
-                    num_estudiantes,
-                    num_actividades,
-                    promedio
-                ])
-        
-        elif tipo == 'actividades':
-            ws.title = "Actividades"
-            headers = ['ID', 'Nombre', 'Tipo', 'Curso', 'Código Curso', 
-                      'Fecha Entrega', 'Porcentaje (%)', 'Estado']
-            ws.append(headers)
-            
-            for cell in ws[1]:
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-            
-            actividades = Actividad.objects.select_related('id_curso')
-            if id_curso:
-                actividades = actividades.filter(id_curso=id_curso)
-            
-            for a in actividades:
-                ws.append([
-                    a.id_actividad,
-                    a.nombre or '',
-                    a.tipo or '',
-                    a.id_curso.nombre if a.id_curso else 'Sin curso',
-                    a.id_curso.codigo if a.id_curso else '-',
-                    a.fecha_entrega.strftime('%d/%m/%Y') if a.fecha_entrega else '-',
-                    a.porcentaje or 0,
-                    a.estado or ''
-                ])
+        # Snapshot pregenerado por `manage.py generar_snapshots`, enviado tal cual desde disco
+        ruta = snapshot_vigente(tipo, id_curso)
+        if ruta:
+            return FileResponse(
+                open(ruta, 'rb'),
+                as_attachment=True,
+                filename=nombre_archivo,
+                content_type=XLSX_CONTENT_TYPE
+            )
         
-        elif tipo == 'reporte_completo':
-            ws.title = "Reporte Completo"
-            headers = ['Curso', 'Código', 'Estudiante', 'Nota Final', 
-                      'Estado', 'Actividades del Curso']
-            ws.append(headers)
-            
-            for cell in ws[1]:
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-            
-            estudiantes = Estudiante.objects.filter(
-                id_curso__estado='Activo'
-            ).select_related('id_curso')
-            
-            for e in estudiantes:
-                num_actividades = Actividad.objects.filter(id_curso=e.id_curso).count() if e.id_curso else 0
-                
-                ws.append([
-                    e.id_curso.nombre if e.id_curso else 'Sin curso',
-                    e.id_curso.codigo if e.id_curso else '-',
-                    e.nombre or '',
-                    float(e.nota_final) if e.nota_final else '-',
-                    e.estado,
-                    num_actividades
-                ])
+        filas = contar_filas(tipo, id_curso)
+        maximo = getattr(settings, 'EXPORTACION_FILAS_MAXIMAS', 0)
+        if maximo and filas > maximo:
+            return Response(
+                {'success': False, 'error': f'La exportación tiene {filas} filas (máximo {maximo}); filtre por id_curso'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Ajustar ancho de columnas
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            
-            for cell in column:
-                try:
-                    if cell.value and len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
+        # Exportaciones grandes: libro write_only, las filas no se acumulan en memoria
+        write_only = filas > getattr(settings, 'EXPORTACION_FILAS_STREAMING', 5000)
         
-        # Agregar pie de página con información
-        ws.append([])
-        ws.append(['Reporte generado:', datetime.now().strftime('%d/%m/%Y %H:%M:%S')])
-        ws.append(['Sistema:', 'Plataforma de Gestión Académica - Django'])
-        ws.append(['Total de registros:', len(list(ws.rows)) - 4])
+        def abrir(ruta):
+            try:
+                return open(ruta, 'rb')
+            except FileNotFoundError:
+                # Generado en otra máquina (cache compartido sin disco compartido) o ya limpiado
+                ruta = generar_excel(tipo, id_curso, write_only)
+                archivo = open(ruta, 'rb')
+                ruta.unlink()
+                return archivo
         
-        # Preparar respuesta HTTP
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        # Peticiones simultáneas del mismo tipo/curso comparten una sola generación (la ruta
+        # del archivo); se borra cuando todas lo abrieron
+        archivo = coalescedor.ejecutar(
+            ('exportar', tipo, id_curso, write_only), lambda: generar_excel(tipo, id_curso, write_only),
+            usar=abrir, liberar=liberar_generado
         )
-        response['Content-Disposition'] = f'attachment; filename="reporte_{tipo}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx"'
         
-        wb.save(response)
-        return response
+        return FileResponse(
+            archivo,
+            as_attachment=True,
+            filename=nombre_archivo,
+            content_type=XLSX_CONTENT_TYPE
+        )
     
     except Exception as e:
         return Response(
             {'success': False, 'error': str(e)}, 
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
\ No newline at end of file
+        )
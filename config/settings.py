@@ -4,6 +4,7 @@ Django settings for config project.
 
 from pathlib import Path
 import os
+import tempfile
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -48,6 +49,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'academic.memoria.MemoriaMiddleware',  # Solo mide con MEMORIA_PERFILAR
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -89,6 +91,14 @@ DATABASES = {
     }
 }
 
+# Base local (SQLite) para datos sintéticos y pruebas de carga, sin tocar la remota:
+# DB_LOCAL=local.sqlite3 python manage.py generar_datos --escala pequena --crear-tablas
+if os.environ.get('DB_LOCAL'):
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / os.environ['DB_LOCAL'],
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -132,6 +142,48 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Exportación a Excel: hilos para generar las hojas del libro completo
+EXPORTACION_MAX_WORKERS = int(os.environ.get('EXPORTACION_MAX_WORKERS', 4))
+
+# Libros generados bajo demanda para /api/exportar/: directorio privado (no
+# dentro de MEDIA_ROOT, que se sirve en /media/); se borran al enviarse
+EXPORTACION_GENERADAS_DIR = Path(os.environ.get(
+    'EXPORTACION_GENERADAS_DIR', Path(tempfile.gettempdir()) / 'gestion_academica_exportaciones'
+))
+
+# Límites por petición: por encima de FILAS_STREAMING el libro se escribe en
+# modo write_only a disco; por encima de FILAS_MAXIMAS se rechaza (0 = sin límite)
+EXPORTACION_FILAS_STREAMING = int(os.environ.get('EXPORTACION_FILAS_STREAMING', 5000))
+EXPORTACION_FILAS_MAXIMAS = int(os.environ.get('EXPORTACION_FILAS_MAXIMAS', 200000))
+
+# Listados sin paginar de estudiantes/actividades: por encima de estas filas
+# el JSON se envía por partes (0 = siempre en una sola respuesta)
+LISTADO_FILAS_STREAMING = int(os.environ.get('LISTADO_FILAS_STREAMING', 10000))
+
+# Pico de memoria por vista con tracemalloc (ver /api/metricas/); tiene costo de CPU
+MEMORIA_PERFILAR = os.environ.get('MEMORIA_PERFILAR', '').lower() in ('1', 'true', 'si')
+
+# Snapshots pregenerados en MEDIA_ROOT/exportaciones: se sirven mientras
+# tengan menos de esta edad (segundos); 0 desactiva su uso en /api/exportar/
+EXPORTACION_SNAPSHOT_MAX_EDAD = int(os.environ.get('EXPORTACION_SNAPSHOT_MAX_EDAD', 900))
+
+# Coalescencia de reportes/exportaciones: alias de un cache compartido (p. ej.
+# Redis) para coordinar también entre procesos; vacío = solo dentro del proceso
+COALESCENCIA_CACHE = os.environ.get('COALESCENCIA_CACHE') or None
+COALESCENCIA_ESPERA_MAXIMA = int(os.environ.get('COALESCENCIA_ESPERA_MAXIMA', 120))
+
+# Rankings de /api/reportes/ (top_estudiantes, posicion_estudiante): viven en
+# memoria de cada worker y se recargan al superar esta edad en segundos, que
+# es el desfase máximo frente a escrituras hechas en otro worker (0 = nunca)
+CLASIFICACIONES_MAX_EDAD = int(os.environ.get('CLASIFICACIONES_MAX_EDAD', 60))
+
+# Escrituras de estudiantes/actividades: segundos que se agrupan los cursos
+# tocados antes de recalcular sus notas en segundo plano; 0 = al confirmar
+RECALCULO_DEMORA = float(os.environ.get('RECALCULO_DEMORA', 0.5))
+
+# Almacén analítico (snapshots Parquet consultados con DuckDB)
+ANALITICA_DIR = Path(os.environ.get('ANALITICA_DIR', BASE_DIR / 'analitica'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 